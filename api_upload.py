@@ -2,14 +2,24 @@
 Financial Automation API - Uses ONLY Existing Files
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
 from typing import Dict, Any, Optional
 from pathlib import Path
 from datetime import datetime
-import tempfile
-import shutil
+from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import asyncio
+import anyio
+import uuid
+import random
+import re
+import os
 import sys
 
 import sys
@@ -24,10 +34,63 @@ except Exception as e:
 # Add current directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from shared.config.logging_config import get_logger
+from shared.utils.clock import now_iso
+
+logger = get_logger(__name__)
+
+# ============================================================================
+# SERVICES
+# ============================================================================
+
+# Docling parsing is CPU-bound, so it runs in separate processes. Each process
+# loads its own parser models, so keep this small.
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "2"))
+
+# Built once per worker by the lifespan handler and shared across requests
+orchestrator = None
+db_manager = None
+parse_pool = None
+
+# Per-process ingestion agent inside the parse pool
+_worker_agent = None
+
+def _parse(file_path: str) -> dict:
+    """Parse one document inside a parse pool process"""
+    global _worker_agent
+    
+    if _worker_agent is None:
+        from processing_layer.document_processing.enhanced_ingestion_agent import EnhancedIngestionAgent
+        _worker_agent = EnhancedIngestionAgent()
+    
+    return _worker_agent.execute({'file_path': file_path})
+
+def init_services():
+    global orchestrator, db_manager, parse_pool
+    
+    from intelligence_layer.orchestration.enhanced_orchestrator import EnhancedOrchestrator
+    from data_layer.database.database_manager import get_database
+    
+    orchestrator = EnhancedOrchestrator()
+    db_manager = get_database()
+    # spawn, not fork: the server process already runs threads (logging, threadpool)
+    parse_pool = ProcessPoolExecutor(
+        max_workers=PARSE_WORKERS,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(init_services)
+    yield
+    parse_pool.shutdown(wait=True, cancel_futures=True)
+
 app = FastAPI(
     title="Financial Automation API",
     description="Upload invoices and generate reports",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -38,12 +101,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress document listings and other large JSON bodies; small responses
+# are passed through untouched
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 
 # ============================================================================
 # MODELS
 # ============================================================================
 
+UPLOAD_CHUNK_SIZE = 1 << 20
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "./data/uploads"))
+UPLOAD_DIR.mkdir(exist_ok=True, parents=True)
+
+# Customer-facing invoice markers, matched in one case-insensitive pass
+# without lowercasing a copy of the whole document text
+CUSTOMER_INVOICE_RE = re.compile(r"bill to|customer|sold to", re.IGNORECASE)
+
+# Fraction of 500s logged with a full traceback; the rest get a one-line
+# error. Lower it if an error storm floods the logs.
+TRACEBACK_SAMPLE_RATE = float(os.getenv("TRACEBACK_SAMPLE_RATE", "1.0"))
+
+
+def server_error(message: str, error: Exception) -> HTTPException:
+    """
+    Log an unexpected error and build the 500 returned to the client
+    
+    The client gets the error text and a request_id to quote; the
+    traceback only goes to the log.
+    """
+    request_id = uuid.uuid4().hex
+    if random.random() < TRACEBACK_SAMPLE_RATE:
+        logger.exception("%s [request_id=%s]", message, request_id)
+    else:
+        logger.error("%s [request_id=%s]: %s", message, request_id, error)
+    return HTTPException(status_code=500, detail={"error": str(error), "request_id": request_id})
+
+
 class QueryRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+    
     query: str
     company_id: str = "spacemarvel_001"
 
@@ -64,25 +161,22 @@ async def upload_invoice(
     - enhanced_ingestion_agent.py (parse with Docling)
     - database_manager.py (save to database)
     """
-    import traceback
+    # Written once to its permanent location; the parser and the stored
+    # document both use this path, so there is no temp copy to clean up
+    file_path = UPLOAD_DIR / f"{uuid.uuid4().hex}{Path(file.filename).suffix}"
+    saved = False
     
     try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as tmp_file:
-            shutil.copyfileobj(file.file, tmp_file)
-            tmp_path = tmp_file.name
+        # Stream in 1 MiB chunks; reads and writes both run off the event loop
+        async with await anyio.open_file(file_path, 'wb') as out_file:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await out_file.write(chunk)
         
-        # Import what we actually have
-        from processing_layer.document_processing.enhanced_ingestion_agent import EnhancedIngestionAgent
-        from data_layer.database.database_manager import DatabaseManager
-        
-        # Parse with enhanced ingestion agent
-        agent = EnhancedIngestionAgent()
-        state = {'file_path': tmp_path}
-        result = agent.execute(state)
+        # Parse with enhanced ingestion agent (in the parse pool)
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(parse_pool, _parse, str(file_path))
         
         if result.get('error_message'):
-            Path(tmp_path).unlink()
             raise HTTPException(status_code=400, detail=result['error_message'])
         
         # Get parsed data
@@ -90,28 +184,23 @@ async def upload_invoice(
         text = parsed_data.get('text', '')
         
         # Simple classification
-        text_lower = text.lower()
-        if any(w in text_lower for w in ['bill to', 'customer', 'sold to']):
+        if CUSTOMER_INVOICE_RE.search(text):
             category = 'customer_invoice'
         else:
             category = 'vendor_invoice'
         
         # Save to database
-        db = DatabaseManager()
-        
         document_data = {
             'company_id': company_id,
             'file_name': file.filename,
-            'file_path': tmp_path,
+            'file_path': str(file_path),
             'category': category,
             'parsed_data': parsed_data,
             'uploaded_at': datetime.now()
         }
         
-        doc_id = db.insert_document(document_data)
-        
-        # Clean up
-        Path(tmp_path).unlink()
+        doc_id = await run_in_threadpool(db_manager.insert_document, document_data)
+        saved = True
         
         return {
             "status": "success",
@@ -121,20 +210,14 @@ async def upload_invoice(
             "message": " Invoice uploaded and saved to database"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        # Clean up on error
-        if 'tmp_path' in locals() and Path(tmp_path).exists():
-            Path(tmp_path).unlink()
-        
-        # Return full traceback
-        tb = traceback.format_exc()
-        raise HTTPException(
-            status_code=500, 
-            detail={
-                "error": str(e),
-                "traceback": tb
-            }
-        )
+        raise server_error(f"Invoice upload failed: {file.filename}", e)
+    finally:
+        # Keep the file only if a document row points at it
+        if not saved:
+            file_path.unlink(missing_ok=True)
 
 
 # ============================================================================
@@ -156,10 +239,7 @@ async def process_query(request: QueryRequest):
     - branded_excel_generator.py (generate report)
     """
     try:
-        from intelligence_layer.orchestration.enhanced_orchestrator import EnhancedOrchestrator
-        
-        orchestrator = EnhancedOrchestrator()
-        result = orchestrator.execute(
+        result = await orchestrator.aexecute(
             request.query,
             context={"company_id": request.company_id}
         )
@@ -179,8 +259,10 @@ async def process_query(request: QueryRequest):
                 detail=result.get('error', 'Query processing failed')
             )
             
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise server_error("Query processing failed", e)
 
 
 # ============================================================================
@@ -192,7 +274,7 @@ async def health_check():
     """Health check"""
     return {
         "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now_iso(),
         "version": "1.0.0"
     }
 
@@ -202,22 +284,26 @@ async def health_check():
 # ============================================================================
 
 @app.get("/api/v1/documents")
-async def list_documents(company_id: str = "spacemarvel_001"):
-    """List all uploaded documents"""
+async def list_documents(
+    company_id: str = "spacemarvel_001",
+    limit: int = Query(10, ge=1, le=5000),
+    offset: int = Query(0, ge=0)
+):
+    """List uploaded documents, newest first (one page, summary columns only)"""
     try:
-        from data_layer.database.database_manager import DatabaseManager
-        
-        db = DatabaseManager()
-        documents = db.get_all_documents(company_id)
+        documents = await run_in_threadpool(db_manager.list_documents_page, company_id, limit, offset)
+        total = await run_in_threadpool(db_manager.count_documents, company_id)
         
         return {
             "status": "success",
-            "total": len(documents),
-            "documents": documents[:10]  # Return first 10
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "documents": documents
         }
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise server_error("Listing documents failed", e)
 
 
 # ============================================================================
@@ -226,5 +312,19 @@ async def list_documents(company_id: str = "spacemarvel_001"):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    
+    # Multiple workers need an import string instead of the app object
+    workers = int(os.getenv("WORKERS", "1"))
+    target = "api_upload:app" if workers > 1 else app
+    
+    # Access logging is off (warning level); app loggers are configured separately
+    uvicorn.run(
+        target,
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=workers,
+        log_level="warning"
+    )
 
@@ -3,8 +3,10 @@ Diagnostic Script - Check What's Available
 Run this to see what components are missing
 """
 
+import importlib
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 print("=" * 80)
 print("COMPONENT AVAILABILITY CHECK")
@@ -37,20 +39,29 @@ print()
 available = []
 missing = []
 
-for name, module_path in components.items():
+def probe(item):
+    """Import one component; returns (name, module_path, error message or None)"""
+    name, module_path = item
     try:
-        parts = module_path.split('.')
-        if len(parts) > 1:
-            # Try importing the module
-            exec(f"from {'.'.join(parts[:-1])} import {parts[-1]}")
-        else:
-            exec(f"import {module_path}")
-        print(f"   {name}: {module_path}")
-        available.append(name)
+        # Already-imported modules come straight from sys.modules
+        if module_path not in sys.modules:
+            importlib.import_module(module_path)
+        return name, module_path, None
     except ImportError as e:
-        print(f"   {name}: {module_path}")
-        print(f"      Error: {e}")
-        missing.append((name, module_path, str(e)))
+        return name, module_path, str(e)
+
+# Imports are mostly disk reads, so cold probes overlap well in threads.
+# map() keeps the results in table order for the report below.
+with ThreadPoolExecutor(max_workers=len(components)) as executor:
+    results = list(executor.map(probe, components.items()))
+
+for name, module_path, error in results:
+    print(f"   {name}: {module_path}")
+    if error is None:
+        available.append(name)
+    else:
+        print(f"      Error: {error}")
+        missing.append((name, module_path, error))
 print()
 
 # Summary
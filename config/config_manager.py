@@ -4,9 +4,175 @@ Database-driven, no hardcoding
 """
 
 from typing import Dict, Any, Optional, List
+from types import MappingProxyType
+from collections import ChainMap
 from datetime import datetime
 import json
+import sys
+import threading
 from pathlib import Path
+from cachetools import LRUCache
+
+
+_EMPTY = MappingProxyType({})
+
+
+def _intern(value):
+    """
+    Intern a lookup key that came from user input or JSON
+    
+    Keys written as literals in this module are interned by the compiler,
+    so interned lookups match them by identity before comparing characters.
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _freeze(value):
+    """Read-only copy of JSON-like config data: dicts become MappingProxyType, lists tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+# Built-in report definitions, created once at import and read-only all the
+# way down, so the shared (and cached) configs can't be changed by a caller.
+# Callers that need a different config build a new one (see WorkflowBuilder).
+_DEFAULT_REPORT_CONFIGS = _freeze({
+    "ap_aging": {
+        "report_type": "ap_aging",
+        "data_source": "invoices",
+        "pipeline": [
+            "fetch_invoices",
+            "calculate_outstanding",
+            "calculate_aging",
+            "filter_by_status",
+            "group_data",
+            "calculate_summary",
+            "generate_output"
+        ],
+        "nodes": {
+            "fetch_invoices": {
+                "node_type": "InvoiceFetchNode",
+                "params": {"category": "purchase"}
+            },
+            "calculate_outstanding": {
+                "node_type": "OutstandingCalculatorNode"
+            },
+            "calculate_aging": {
+                "node_type": "AgingCalculatorNode"
+            },
+            "filter_by_status": {
+                "node_type": "FilterNode",
+                "params": {
+                    "conditions": [
+                        {"field": "status", "operator": "in", "value": ["unpaid", "partially_paid"]}
+                    ]
+                }
+            },
+            "group_data": {
+                "node_type": "GroupingNode",
+                "params": {"group_by": "aging_bucket"}
+            },
+            "calculate_summary": {
+                "node_type": "SummaryNode"
+            },
+            "generate_output": {
+                "node_type": "ExcelGeneratorNode"
+            }
+        },
+        "settings": {
+            "aging_buckets": [30, 60, 90],
+            "include_paid": False,
+            "currency": "INR"
+        }
+    },
+    
+    "ar_collection": {
+        "report_type": "ar_collection",
+        "pipeline": [
+            "fetch_invoices",
+            "calculate_aging",
+            "check_sla",
+            "calculate_priority",
+            "apply_rules",
+            "sort_by_priority",
+            "generate_output"
+        ],
+        "nodes": {
+            "fetch_invoices": {
+                "node_type": "InvoiceFetchNode",
+                "params": {"category": "sales"}
+            },
+            "calculate_aging": {
+                "node_type": "AgingCalculatorNode"
+            },
+            "check_sla": {
+                "node_type": "SLACheckerNode",
+                "params": {"sla_days": 30}
+            },
+            "calculate_priority": {
+                "node_type": "CustomCalculationNode",
+                "params": {
+                    "formula": "outstanding * aging_days * sla_multiplier"
+                }
+            },
+            "apply_rules": {
+                "node_type": "RuleEngineNode",
+                "params": {
+                    "rule_set": "collection_priority"
+                }
+            },
+            "sort_by_priority": {
+                "node_type": "SortNode",
+                "params": {
+                    "sort_by": [{"field": "priority_score", "order": "desc"}]
+                }
+            },
+            "generate_output": {
+                "node_type": "ExcelGeneratorNode"
+            }
+        },
+        "settings": {
+            "sla_days": 30,
+            "priority_weights": {
+                "amount": 1.0,
+                "age": 1.0,
+                "sla": 2.0
+            }
+        }
+    }
+})
+
+# Organization-specific node defaults
+_DEFAULT_NODE_CONFIGS = _freeze({
+    "default": {
+        "AgingCalculatorNode": {
+            "aging_buckets": [30, 60, 90],
+            "as_of_date_mode": "current"
+        },
+        "SLACheckerNode": {
+            "sla_days": 30,
+            "business_days_only": False
+        },
+        "DuplicateDetectorNode": {
+            "tolerance": 0.01,
+            "min_confidence": 75
+        }
+    }
+})
+
+# Output format -> generator node used for the workflow's generate_output step
+_OUTPUT_NODE_TYPES = MappingProxyType({
+    "excel": "ExcelGeneratorNode",
+    "pdf": "PDFGeneratorNode",
+    "json": "JSONGeneratorNode",
+    "word": "WordGeneratorNode"
+})
+
+# Leading character of a string filter value -> comparison operator
+_PREFIX_OPERATORS = MappingProxyType({">": ">", "<": "<"})
 
 
 class ConfigurationManager:
@@ -28,7 +194,9 @@ class ConfigurationManager:
             config_source: "database", "file", "api"
         """
         self.config_source = config_source
-        self.cache = {}
+        # Bounded, so many tenants can't grow it without limit
+        self.cache = LRUCache(maxsize=512)
+        self._cache_lock = threading.Lock()
         self.version = "1.0.0"
     
     def get_report_config(self, report_type: str, org_id: str = "default") -> Dict[str, Any]:
@@ -42,11 +210,15 @@ class ConfigurationManager:
         Returns:
             Report configuration
         """
-        cache_key = f"{org_id}:{report_type}"
+        report_type = _intern(report_type)
+        org_id = _intern(org_id)
+        cache_key = (org_id, report_type)
         
-        # Check cache
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        # Check cache (one lookup; LRUCache reorders on get, hence the lock)
+        with self._cache_lock:
+            config = self.cache.get(cache_key)
+        if config is not None:
+            return config
         
         # Load from source
         if self.config_source == "database":
@@ -57,10 +229,16 @@ class ConfigurationManager:
             config = self._get_default_config(report_type)
         
         # Cache it
-        self.cache[cache_key] = config
+        with self._cache_lock:
+            self.cache[cache_key] = config
         
         return config
     
+    def invalidate(self):
+        """Drop cached report configs so the next lookup reloads them (hot reload)"""
+        with self._cache_lock:
+            self.cache.clear()
+    
     def get_node_config(self, node_type: str, org_id: str = "default") -> Dict[str, Any]:
         """
         Get configuration for a node
@@ -73,7 +251,7 @@ class ConfigurationManager:
             Node configuration
         """
         # In production: load from database
-        return self._get_default_node_config(node_type, org_id)
+        return self._get_default_node_config(_intern(node_type), _intern(org_id))
     
     def get_workflow_config(self, workflow_id: str, org_id: str = "default") -> Dict[str, Any]:
         """
@@ -115,7 +293,7 @@ class ConfigurationManager:
         
         if config_path.exists():
             with open(config_path, 'r') as f:
-                return json.load(f)
+                return _freeze(json.load(f))
         
         return self._get_default_config(report_type)
     
@@ -131,137 +309,11 @@ class ConfigurationManager:
     
     def _get_default_config(self, report_type: str) -> Dict[str, Any]:
         """Get default configuration for report type"""
-        
-        configs = {
-            "ap_aging": {
-                "report_type": "ap_aging",
-                "data_source": "invoices",
-                "pipeline": [
-                    "fetch_invoices",
-                    "calculate_outstanding",
-                    "calculate_aging",
-                    "filter_by_status",
-                    "group_data",
-                    "calculate_summary",
-                    "generate_output"
-                ],
-                "nodes": {
-                    "fetch_invoices": {
-                        "node_type": "InvoiceFetchNode",
-                        "params": {"category": "purchase"}
-                    },
-                    "calculate_outstanding": {
-                        "node_type": "OutstandingCalculatorNode"
-                    },
-                    "calculate_aging": {
-                        "node_type": "AgingCalculatorNode"
-                    },
-                    "filter_by_status": {
-                        "node_type": "FilterNode",
-                        "params": {
-                            "conditions": [
-                                {"field": "status", "operator": "in", "value": ["unpaid", "partially_paid"]}
-                            ]
-                        }
-                    },
-                    "group_data": {
-                        "node_type": "GroupingNode",
-                        "params": {"group_by": "aging_bucket"}
-                    },
-                    "calculate_summary": {
-                        "node_type": "SummaryNode"
-                    },
-                    "generate_output": {
-                        "node_type": "ExcelGeneratorNode"
-                    }
-                },
-                "settings": {
-                    "aging_buckets": [30, 60, 90],
-                    "include_paid": False,
-                    "currency": "INR"
-                }
-            },
-            
-            "ar_collection": {
-                "report_type": "ar_collection",
-                "pipeline": [
-                    "fetch_invoices",
-                    "calculate_aging",
-                    "check_sla",
-                    "calculate_priority",
-                    "apply_rules",
-                    "sort_by_priority",
-                    "generate_output"
-                ],
-                "nodes": {
-                    "fetch_invoices": {
-                        "node_type": "InvoiceFetchNode",
-                        "params": {"category": "sales"}
-                    },
-                    "calculate_aging": {
-                        "node_type": "AgingCalculatorNode"
-                    },
-                    "check_sla": {
-                        "node_type": "SLACheckerNode",
-                        "params": {"sla_days": 30}
-                    },
-                    "calculate_priority": {
-                        "node_type": "CustomCalculationNode",
-                        "params": {
-                            "formula": "outstanding * aging_days * sla_multiplier"
-                        }
-                    },
-                    "apply_rules": {
-                        "node_type": "RuleEngineNode",
-                        "params": {
-                            "rule_set": "collection_priority"
-                        }
-                    },
-                    "sort_by_priority": {
-                        "node_type": "SortNode",
-                        "params": {
-                            "sort_by": [{"field": "priority_score", "order": "desc"}]
-                        }
-                    },
-                    "generate_output": {
-                        "node_type": "ExcelGeneratorNode"
-                    }
-                },
-                "settings": {
-                    "sla_days": 30,
-                    "priority_weights": {
-                        "amount": 1.0,
-                        "age": 1.0,
-                        "sla": 2.0
-                    }
-                }
-            }
-        }
-        
-        return configs.get(report_type, {})
+        return _DEFAULT_REPORT_CONFIGS.get(report_type, _EMPTY)
     
     def _get_default_node_config(self, node_type: str, org_id: str) -> Dict[str, Any]:
         """Get default node configuration"""
-        
-        # Organization-specific overrides
-        org_configs = {
-            "default": {
-                "AgingCalculatorNode": {
-                    "aging_buckets": [30, 60, 90],
-                    "as_of_date_mode": "current"
-                },
-                "SLACheckerNode": {
-                    "sla_days": 30,
-                    "business_days_only": False
-                },
-                "DuplicateDetectorNode": {
-                    "tolerance": 0.01,
-                    "min_confidence": 75
-                }
-            }
-        }
-        
-        return org_configs.get(org_id, {}).get(node_type, {})
+        return _DEFAULT_NODE_CONFIGS.get(org_id, _EMPTY).get(node_type, _EMPTY)
 
 
 class WorkflowBuilder:
@@ -299,92 +351,91 @@ class WorkflowBuilder:
         if not base_config:
             return None
         
+        # Overrides go into the overlay's first map; everything else is read
+        # through from the shared base config, which is never modified
+        modified_config = ChainMap({}, base_config)
+        
         # Apply filters to configuration
-        modified_config = self._apply_filters(base_config, filters)
+        self._apply_filters(modified_config, filters)
         
         # Set output format
-        modified_config = self._set_output_format(modified_config, output_format)
+        self._set_output_format(modified_config, output_format)
         
-        return modified_config
+        # Callers get a plain dict; the overlay stays internal
+        return dict(modified_config)
     
-    def _apply_filters(self, config: Dict, filters: Dict) -> Dict:
+    def _apply_filters(self, config: ChainMap, filters: Dict) -> ChainMap:
         """
         Apply runtime filters to configuration
         
         Args:
-            config: Base configuration
+            config: Overlay on the base configuration (written in place)
             filters: Runtime filters
             
         Returns:
             Modified configuration
         """
-        config = config.copy()
+        # Conditions from filters, built once and shared by every filter node
+        # (dates are handled separately)
+        new_conditions = [
+            {"field": field, "operator": self._infer_operator(value), "value": value}
+            for field, value in filters.items()
+            if field != 'date_from' and field != 'date_to'
+        ]
+        
+        nodes = config.get('nodes')
+        if not nodes or not new_conditions:
+            return config
         
-        # Find filter node in pipeline
-        if 'nodes' in config:
-            for node_name, node_config in config['nodes'].items():
-                if node_config['node_type'] == 'FilterNode':
-                    # Add/modify filter conditions
-                    conditions = node_config.get('params', {}).get('conditions', [])
-                    
-                    # Add new conditions from filters
-                    for field, value in filters.items():
-                        if field == 'date_from' or field == 'date_to':
-                            continue  # Handle separately
-                        
-                        # Add condition
-                        conditions.append({
-                            "field": field,
-                            "operator": self._infer_operator(value),
-                            "value": value
-                        })
-                    
-                    node_config['params']['conditions'] = conditions
+        # Find filter node in pipeline; copy-on-write just the nodes that change
+        new_nodes = None
+        for node_name, node_config in nodes.items():
+            if node_config['node_type'] == 'FilterNode':
+                params = dict(node_config.get('params') or {})
+                conditions = list(params.get('conditions', ()))
+                conditions.extend(new_conditions)
+                params['conditions'] = conditions
+                
+                if new_nodes is None:
+                    new_nodes = dict(nodes)
+                new_nodes[node_name] = {**node_config, 'params': params}
+        
+        if new_nodes is not None:
+            config['nodes'] = new_nodes
         
         return config
     
-    def _set_output_format(self, config: Dict, output_format: str) -> Dict:
+    def _set_output_format(self, config: ChainMap, output_format: str) -> ChainMap:
         """
         Set output format in configuration
         
         Args:
-            config: Configuration
+            config: Overlay on the base configuration (written in place)
             output_format: Desired format
             
         Returns:
             Modified configuration
         """
-        config = config.copy()
-        
         # Map format to node type
-        format_map = {
-            "excel": "ExcelGeneratorNode",
-            "pdf": "PDFGeneratorNode",
-            "json": "JSONGeneratorNode",
-            "word": "WordGeneratorNode"
-        }
-        
-        node_type = format_map.get(output_format, "ExcelGeneratorNode")
+        node_type = _OUTPUT_NODE_TYPES.get(output_format, "ExcelGeneratorNode")
         
-        # Update output node
-        if 'nodes' in config and 'generate_output' in config['nodes']:
-            config['nodes']['generate_output']['node_type'] = node_type
+        # Update output node, copying only the dicts on the way to it
+        nodes = config.get('nodes')
+        output_node = nodes.get('generate_output') if nodes else None
+        if output_node is not None:
+            # The filter step may already have given the overlay its own nodes dict
+            if 'nodes' not in config.maps[0]:
+                nodes = config['nodes'] = dict(nodes)
+            nodes['generate_output'] = {**output_node, 'node_type': node_type}
         
         return config
     
     def _infer_operator(self, value: Any) -> str:
         """Infer operator from value type"""
-        if isinstance(value, list):
-            return "in"
-        elif isinstance(value, str):
-            if value.startswith('>'):
-                return ">"
-            elif value.startswith('<'):
-                return "<"
-            else:
-                return "contains"
-        else:
-            return "="
+        if isinstance(value, str):
+            # ">100" / "<100" compare; any other string is a substring match
+            return _PREFIX_OPERATORS.get(value[:1], "contains")
+        return "in" if isinstance(value, list) else "="
 
 
 # Singleton instance
@@ -5,17 +5,51 @@ Stores uploaded documents in PostgreSQL database
 
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
+from psycopg2 import sql
 import json
+import orjson
 import os
+import threading
 import uuid
+import zstandard
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from shared.config.logging_config import get_logger
 
 
 logger = get_logger(__name__)
 
+# Parsed documents larger than this are written to a compressed side file;
+# the JSONB column then holds only {"$ref": file name, "summary": {...}}.
+# Refs are resolved against PARSED_DATA_DIR, so the directory can move.
+PARSED_DATA_INLINE_LIMIT = 256 * 1024
+PARSED_DATA_DIR = Path(os.getenv("PARSED_DATA_DIR", "./data/uploads/parsed")).resolve()
+
+# orjson is several times faster than json.dumps on large Docling output;
+# non-string keys are stringified the way json.dumps does
+JSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+# Connection pool bounds. Each API worker holds its own pool next to
+# production_api's SQLAlchemy pool (DB_POOL_SIZE + DB_MAX_OVERFLOW), so
+# workers * (DB_POOL_MAX + DB_POOL_SIZE + DB_MAX_OVERFLOW) must stay under
+# the server's max_connections: 4 * (10 + 5 + 5) = 80 with the defaults.
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+# Seconds a caller waits for a free connection before PoolError
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Server-side cap on a single statement (0 disables it)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "60000"))
+
+# Columns list_documents_page may select (everything except the JSONB blobs)
+LIST_COLUMNS = frozenset({
+    "id", "company_id", "file_name", "file_path", "file_type", "document_number",
+    "document_date", "category", "grand_total", "tax_total", "paid_amount",
+    "outstanding", "vendor_name", "customer_name", "uploaded_at", "processed_at"
+})
+
 
 class DatabaseManager:
     """
@@ -40,26 +74,60 @@ class DatabaseManager:
         self.user = user or os.getenv("DB_USER", "postgres")
         self.password = password or os.getenv("DB_PASSWORD", "postgres")
         
-        self.conn = None
+        self.pool = None
         self.initialize_database()
         
         logger.info(f"PostgreSQL database initialized: {self.database}@{self.host}")
     
     def initialize_database(self):
-        """Create database connection (tables already exist in production)"""
-        # Connect to PostgreSQL
-        self.conn = psycopg2.connect(
+        """Create the connection pool (tables already exist in production)"""
+        self.pool = psycopg2.pool.ThreadedConnectionPool(
+            DB_POOL_MIN,
+            DB_POOL_MAX,
             host=self.host,
             port=self.port,
             database=self.database,
             user=self.user,
-            password=self.password
+            password=self.password,
+            # Detect connections dropped by the network while idle in the pool
+            keepalives=1,
+            keepalives_idle=60,
+            keepalives_interval=10,
+            keepalives_count=3,
+            options=f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
         )
+        # ThreadedConnectionPool raises as soon as it is exhausted; the
+        # semaphore makes callers wait up to DB_POOL_TIMEOUT instead
+        self._slots = threading.BoundedSemaphore(DB_POOL_MAX)
         
-        # Use RealDictCursor for dictionary results
-        self.conn.autocommit = False
+        logger.info(f"PostgreSQL connection pool ready ({DB_POOL_MIN}-{DB_POOL_MAX} connections)")
+    
+    @contextmanager
+    def connection(self):
+        """
+        Check a connection out of the pool for the duration of a with block
         
-        logger.info("PostgreSQL connection established")
+        Usage:
+            with db.connection() as conn:
+                cursor = conn.cursor()
+                ...
+                conn.commit()
+        
+        Callers commit their own writes. Uncommitted work is rolled back
+        when the connection goes back to the pool.
+        """
+        if not self._slots.acquire(timeout=DB_POOL_TIMEOUT):
+            raise psycopg2.pool.PoolError(f"No database connection free after {DB_POOL_TIMEOUT}s")
+        try:
+            conn = self.pool.getconn()
+            try:
+                yield conn
+            finally:
+                # putconn rolls back an open transaction and discards
+                # connections that were closed underneath us
+                self.pool.putconn(conn)
+        finally:
+            self._slots.release()
     
     def insert_document(self, document_data: Dict[str, Any]) -> str:
         """
@@ -71,8 +139,6 @@ class DatabaseManager:
         Returns:
             Document ID (string UUID)
         """
-        cursor = self.conn.cursor()
-        
         # Prepare data
         company_id = document_data.get("company_id", "default")
         file_name = document_data.get("file_name", "")
@@ -147,41 +213,94 @@ class DatabaseManager:
         vendor_name = document_data.get("vendor_name", "")
         customer_name = document_data.get("customer_name", "")
         
+        # Get or generate document ID
+        doc_id = document_data.get("id") or str(uuid.uuid4())
+        
         # Prepare JSON data
-        docling_parsed_data = json.dumps(document_data.get("parsed_data", {}))
-        canonical_data_json = json.dumps(document_data.get("canonical_data", {}))
+        parsed_data = document_data.get("parsed_data", {})
+        parsed_json = orjson.dumps(parsed_data, option=JSON_OPTIONS)
+        offloaded_path = None
+        if len(parsed_json) > PARSED_DATA_INLINE_LIMIT:
+            docling_parsed_data, offloaded_path = self._offload_parsed_data(doc_id, parsed_data, parsed_json)
+        else:
+            docling_parsed_data = parsed_json.decode("utf-8")
+        canonical_data_json = orjson.dumps(document_data.get("canonical_data", {}), option=JSON_OPTIONS).decode("utf-8")
         
         uploaded_at = datetime.now()
         processed_at = uploaded_at
         
-        # Get or generate document ID
-        doc_id = document_data.get("id") or str(uuid.uuid4())
-        
         # INSERT matching actual schema
-        cursor.execute("""
-            INSERT INTO documents (
-                id, company_id, file_name, file_path, file_type,
-                document_number, document_date, category,
+        try:
+            self._insert_row((
+                doc_id, company_id, file_name, file_path, file_type,
+                document_number, document_date, category,  # document_date is already a date object
                 grand_total, tax_total, paid_amount, outstanding,
                 vendor_name, customer_name,
-                docling_parsed_data, canonical_data,
+                docling_parsed_data, canonical_data_json,
                 uploaded_at, processed_at
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            doc_id, company_id, file_name, file_path, file_type,
-            document_number, document_date, category,  # document_date is already a date object
-            grand_total, tax_total, paid_amount, outstanding,
-            vendor_name, customer_name,
-            docling_parsed_data, canonical_data_json,
-            uploaded_at, processed_at
-        ))
-        
-        self.conn.commit()
+            ))
+        except Exception:
+            # No row will ever point at the side file
+            if offloaded_path is not None:
+                offloaded_path.unlink(missing_ok=True)
+            raise
         
         logger.info(f" Document inserted: ID={doc_id}, ₹{grand_total:.2f} total, Date={document_date}")
         
         return doc_id
     
+    def _insert_row(self, values: tuple):
+        """INSERT one documents row and commit"""
+        with self.connection() as conn, conn.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO documents (
+                    id, company_id, file_name, file_path, file_type,
+                    document_number, document_date, category,
+                    grand_total, tax_total, paid_amount, outstanding,
+                    vendor_name, customer_name,
+                    docling_parsed_data, canonical_data,
+                    uploaded_at, processed_at
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, values)
+            conn.commit()
+    
+    def _offload_parsed_data(self, doc_id: str, parsed_data: Any, parsed_json: bytes) -> Tuple[str, Path]:
+        """
+        Write large parsed output to PARSED_DATA_DIR as zstd-compressed JSON
+        
+        Returns:
+            JSON for the docling_parsed_data column (a reference plus a small
+            summary) and the path of the file written
+        """
+        PARSED_DATA_DIR.mkdir(parents=True, exist_ok=True)
+        path = PARSED_DATA_DIR / f"{doc_id}.json.zst"
+        path.write_bytes(zstandard.ZstdCompressor(level=3).compress(parsed_json))
+        
+        summary = {"size_bytes": len(parsed_json)}
+        if isinstance(parsed_data, dict):
+            summary["keys"] = sorted(parsed_data)
+            summary["text_length"] = len(parsed_data.get("text") or "")
+        
+        logger.info(f"Parsed data for {doc_id} offloaded to {path} ({len(parsed_json)} bytes)")
+        
+        column = orjson.dumps({"$ref": path.name, "summary": summary}).decode("utf-8")
+        return column, path
+    
+    @staticmethod
+    def load_parsed_data(value: Any) -> Any:
+        """
+        Resolve an offloaded docling_parsed_data value; other values pass through
+        
+        Only get_document_by_id resolves automatically. Rows from list
+        readers (get_all_documents, get_documents_by_category) may hold the
+        {"$ref", "summary"} placeholder; pass it through here to get the
+        full parsed output.
+        """
+        if isinstance(value, dict) and "$ref" in value:
+            raw = zstandard.ZstdDecompressor().decompress((PARSED_DATA_DIR / value["$ref"]).read_bytes())
+            return orjson.loads(raw)
+        return value
+    
     def _parse_date(self, date_str: str) -> Optional[Any]:
         """
         Parse date string to DATE object (handles all formats)
@@ -229,23 +348,25 @@ class DatabaseManager:
             company_id: Filter by company (optional)
             
         Returns:
-            List of document dictionaries
+            List of document dictionaries; an offloaded docling_parsed_data
+            stays a reference (see load_parsed_data)
         """
-        cursor = self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
-        if company_id:
-            cursor.execute("""
-                SELECT * FROM documents 
-                WHERE company_id = %s
-                ORDER BY uploaded_at DESC
-            """, (company_id,))
-        else:
-            cursor.execute("""
-                SELECT * FROM documents 
-                ORDER BY uploaded_at DESC
-            """)
-        
-        rows = cursor.fetchall()
+        with self.connection() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            
+            if company_id:
+                cursor.execute("""
+                    SELECT * FROM documents 
+                    WHERE company_id = %s
+                    ORDER BY uploaded_at DESC
+                """, (company_id,))
+            else:
+                cursor.execute("""
+                    SELECT * FROM documents 
+                    ORDER BY uploaded_at DESC
+                """)
+            
+            rows = cursor.fetchall()
         
         documents = []
         for row in rows:
@@ -269,6 +390,68 @@ class DatabaseManager:
         
         return documents
     
+    def list_documents_page(self,
+                            company_id: str,
+                            limit: int = 10,
+                            offset: int = 0,
+                            columns: tuple = ("id", "file_name", "category", "uploaded_at")) -> List[Dict[str, Any]]:
+        """
+        One page of a company's documents, newest first, with only the requested columns
+        
+        Args:
+            company_id: Company to list
+            limit: Page size
+            offset: Rows to skip
+            columns: Column names to return (must be in LIST_COLUMNS)
+            
+        Returns:
+            List of document dictionaries
+        """
+        unknown = set(columns) - LIST_COLUMNS
+        if unknown:
+            raise ValueError(f"Unknown document columns: {', '.join(sorted(unknown))}")
+        
+        query = sql.SQL("""
+            SELECT {columns} FROM documents
+            WHERE company_id = %s
+            ORDER BY uploaded_at DESC
+            LIMIT %s OFFSET %s
+        """).format(columns=sql.SQL(", ").join(map(sql.Identifier, columns)))
+        
+        # Large pages stream through a server-side cursor instead of
+        # materializing the whole result in the driver at once
+        with self.connection() as conn:
+            if limit > 1000:
+                cursor = conn.cursor(name=f"documents_page_{uuid.uuid4().hex}",
+                                     cursor_factory=psycopg2.extras.RealDictCursor)
+                cursor.itersize = 1000
+            else:
+                cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            
+            try:
+                cursor.execute(query, (company_id, limit, offset))
+                documents = []
+                for row in cursor:
+                    doc = dict(row)
+                    for field in ('uploaded_at', 'processed_at', 'document_date'):
+                        if doc.get(field):
+                            doc[field] = doc[field].isoformat()
+                    documents.append(doc)
+            finally:
+                cursor.close()
+        
+        return documents
+    
+    def count_documents(self, company_id: str) -> int:
+        """Number of documents stored for a company"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT COUNT(*) FROM documents WHERE company_id = %s", (company_id,))
+                return cursor.fetchone()[0]
+            finally:
+                cursor.close()
+    
     def get_documents_by_category(self, category: str, company_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Get documents filtered by category from PostgreSQL
@@ -278,24 +461,26 @@ class DatabaseManager:
             company_id: Filter by company (optional)
             
         Returns:
-            List of document dictionaries
+            List of document dictionaries; an offloaded docling_parsed_data
+            stays a reference (see load_parsed_data)
         """
-        cursor = self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
-        if company_id:
-            cursor.execute("""
-                SELECT * FROM documents 
-                WHERE category = %s AND company_id = %s
-                ORDER BY document_date DESC NULLS LAST, uploaded_at DESC
-            """, (category, company_id))
-        else:
-            cursor.execute("""
-                SELECT * FROM documents 
-                WHERE category = %s
-                ORDER BY document_date DESC NULLS LAST, uploaded_at DESC
-            """, (category,))
-        
-        rows = cursor.fetchall()
+        with self.connection() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            
+            if company_id:
+                cursor.execute("""
+                    SELECT * FROM documents 
+                    WHERE category = %s AND company_id = %s
+                    ORDER BY document_date DESC NULLS LAST, uploaded_at DESC
+                """, (category, company_id))
+            else:
+                cursor.execute("""
+                    SELECT * FROM documents 
+                    WHERE category = %s
+                    ORDER BY document_date DESC NULLS LAST, uploaded_at DESC
+                """, (category,))
+            
+            rows = cursor.fetchall()
         
         documents = []
         for row in rows:
@@ -320,10 +505,11 @@ class DatabaseManager:
     
     def get_document_by_id(self, doc_id: int) -> Optional[Dict[str, Any]]:
         """Get a specific document by ID from PostgreSQL"""
-        cursor = self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
-        cursor.execute("SELECT * FROM documents WHERE id = %s", (doc_id,))
-        row = cursor.fetchone()
+        with self.connection() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            
+            cursor.execute("SELECT * FROM documents WHERE id = %s", (doc_id,))
+            row = cursor.fetchone()
         
         if row:
             doc = dict(row)
@@ -333,17 +519,29 @@ class DatabaseManager:
             if isinstance(doc.get('canonical_data'), str):
                 doc['canonical_data'] = json.loads(doc['canonical_data'])
             
+            # Single-document reads return the full parsed output; list
+            # queries keep the lightweight reference
+            try:
+                doc['docling_parsed_data'] = self.load_parsed_data(doc.get('docling_parsed_data'))
+            except FileNotFoundError as e:
+                # Side file lost (deleted or PARSED_DATA_DIR moved); the
+                # reference and its summary are still worth returning
+                logger.error(f"Parsed data for document {doc_id} is missing: {e}")
+            
             return doc
         
         return None
     
     def delete_document(self, doc_id: int) -> bool:
         """Delete a document from PostgreSQL"""
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM documents WHERE id = %s", (doc_id,))
-        self.conn.commit()
-        
-        deleted = cursor.rowcount > 0
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM documents WHERE id = %s", (doc_id,))
+            conn.commit()
+            
+            deleted = cursor.rowcount > 0
+        if deleted:
+            (PARSED_DATA_DIR / f"{doc_id}.json.zst").unlink(missing_ok=True)
         logger.info(f"Document {doc_id} deleted from PostgreSQL: {deleted}")
         
         return deleted
@@ -358,13 +556,14 @@ class DatabaseManager:
         Returns:
             List of company aliases
         """
-        cursor = self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
-        cursor.execute("""
-            SELECT company_aliases FROM companies WHERE id = %s
-        """, (company_id,))
-        
-        row = cursor.fetchone()
+        with self.connection() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            
+            cursor.execute("""
+                SELECT company_aliases FROM companies WHERE id = %s
+            """, (company_id,))
+            
+            row = cursor.fetchone()
         
         if row and row.get('company_aliases'):
             aliases = row['company_aliases']
@@ -383,35 +582,36 @@ class DatabaseManager:
     
     def get_statistics(self, company_id: Optional[str] = None) -> Dict[str, Any]:
         """Get database statistics from PostgreSQL"""
-        cursor = self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
-        if company_id:
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as total_documents,
-                    COUNT(CASE WHEN category = 'purchase' THEN 1 END) as purchase_count,
-                    COUNT(CASE WHEN category = 'sales' THEN 1 END) as sales_count,
-                    SUM(CASE WHEN category = 'purchase' THEN grand_total ELSE 0 END) as total_purchases,
-                    SUM(CASE WHEN category = 'sales' THEN grand_total ELSE 0 END) as total_sales,
-                    SUM(CASE WHEN category = 'purchase' THEN outstanding ELSE 0 END) as total_payables,
-                    SUM(CASE WHEN category = 'sales' THEN outstanding ELSE 0 END) as total_receivables
-                FROM documents
-                WHERE company_id = %s
-            """, (company_id,))
-        else:
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as total_documents,
-                    COUNT(CASE WHEN category = 'purchase' THEN 1 END) as purchase_count,
-                    COUNT(CASE WHEN category = 'sales' THEN 1 END) as sales_count,
-                    SUM(CASE WHEN category = 'purchase' THEN grand_total ELSE 0 END) as total_purchases,
-                    SUM(CASE WHEN category = 'sales' THEN grand_total ELSE 0 END) as total_sales,
-                    SUM(CASE WHEN category = 'purchase' THEN outstanding ELSE 0 END) as total_payables,
-                    SUM(CASE WHEN category = 'sales' THEN outstanding ELSE 0 END) as total_receivables
-                FROM documents
-            """)
-        
-        row = cursor.fetchone()
+        with self.connection() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            
+            if company_id:
+                cursor.execute("""
+                    SELECT 
+                        COUNT(*) as total_documents,
+                        COUNT(CASE WHEN category = 'purchase' THEN 1 END) as purchase_count,
+                        COUNT(CASE WHEN category = 'sales' THEN 1 END) as sales_count,
+                        SUM(CASE WHEN category = 'purchase' THEN grand_total ELSE 0 END) as total_purchases,
+                        SUM(CASE WHEN category = 'sales' THEN grand_total ELSE 0 END) as total_sales,
+                        SUM(CASE WHEN category = 'purchase' THEN outstanding ELSE 0 END) as total_payables,
+                        SUM(CASE WHEN category = 'sales' THEN outstanding ELSE 0 END) as total_receivables
+                    FROM documents
+                    WHERE company_id = %s
+                """, (company_id,))
+            else:
+                cursor.execute("""
+                    SELECT 
+                        COUNT(*) as total_documents,
+                        COUNT(CASE WHEN category = 'purchase' THEN 1 END) as purchase_count,
+                        COUNT(CASE WHEN category = 'sales' THEN 1 END) as sales_count,
+                        SUM(CASE WHEN category = 'purchase' THEN grand_total ELSE 0 END) as total_purchases,
+                        SUM(CASE WHEN category = 'sales' THEN grand_total ELSE 0 END) as total_sales,
+                        SUM(CASE WHEN category = 'purchase' THEN outstanding ELSE 0 END) as total_payables,
+                        SUM(CASE WHEN category = 'sales' THEN outstanding ELSE 0 END) as total_receivables
+                    FROM documents
+                """)
+            
+            row = cursor.fetchone()
         
         return {
             "total_documents": int(row['total_documents']) if row['total_documents'] else 0,
@@ -424,10 +624,10 @@ class DatabaseManager:
         }
     
     def close(self):
-        """Close PostgreSQL database connection"""
-        if self.conn:
-            self.conn.close()
-            logger.info("PostgreSQL connection closed")
+        """Close all pooled PostgreSQL connections"""
+        if self.pool:
+            self.pool.closeall()
+            logger.info("PostgreSQL connection pool closed")
 
 
 # Global database instance
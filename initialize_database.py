@@ -303,6 +303,7 @@ CREATE INDEX IF NOT EXISTS idx_documents_type ON documents(document_type);
 CREATE INDEX IF NOT EXISTS idx_documents_category ON documents(category);
 CREATE INDEX IF NOT EXISTS idx_documents_number ON documents(document_number);
 CREATE INDEX IF NOT EXISTS idx_documents_uploaded ON documents(uploaded_at);
+CREATE INDEX IF NOT EXISTS idx_documents_company_uploaded ON documents(company_id, uploaded_at DESC);
 
 -- Vendor Invoices
 CREATE INDEX IF NOT EXISTS idx_vendor_invoices_company ON vendor_invoices(company_id);
@@ -323,6 +324,7 @@ CREATE INDEX IF NOT EXISTS idx_workflows_company ON workflows(company_id);
 CREATE INDEX IF NOT EXISTS idx_workflows_user ON workflows(user_id);
 CREATE INDEX IF NOT EXISTS idx_workflows_status ON workflows(status);
 CREATE INDEX IF NOT EXISTS idx_workflows_created ON workflows(created_at);
+CREATE INDEX IF NOT EXISTS idx_workflows_company_created ON workflows(company_id, created_at DESC);
 
 -- Workflow Logs
 CREATE INDEX IF NOT EXISTS idx_workflow_logs_workflow ON workflow_execution_logs(workflow_id);
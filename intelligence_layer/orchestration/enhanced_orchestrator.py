@@ -4,9 +4,13 @@ Uses 11-domain classification and variable extraction for intelligent routing
 """
 
 from typing import Dict, Any, Optional
+from collections import deque
 from datetime import datetime
+import asyncio
 import json
 
+from processing_layer.agents.core.base_agent import MAX_HISTORY
+
 
 class EnhancedOrchestrator:
     """
@@ -33,7 +37,7 @@ class EnhancedOrchestrator:
         from intelligence_layer.parsing.enhanced_intent_parser import EnhancedIntentParser
         
         self.parser = EnhancedIntentParser(llm_client=llm_client)
-        self.execution_history = []
+        self.execution_history = deque(maxlen=MAX_HISTORY)
         
         self.domain_agent_map = self._build_domain_agent_map()
     
@@ -55,15 +59,42 @@ class EnhancedOrchestrator:
             }
         """
         start_time = datetime.now()
+        self._print_header(query)
+        
+        try:
+            intent = self.parser.parse(query, context)
+        except Exception as e:
+            return self._error_result(query, e, start_time)
         
+        return self._route_and_execute(query, intent, start_time)
+    
+    async def aexecute(self, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Async version of execute() for use from the event loop
+        
+        Intent parsing runs its two LLM calls concurrently without holding a
+        worker thread while it waits; the agent itself (DB + report building)
+        runs in a worker thread.
+        """
+        start_time = datetime.now()
+        self._print_header(query)
+        
+        try:
+            intent = await self.parser.aparse(query, context)
+        except Exception as e:
+            return self._error_result(query, e, start_time)
+        
+        return await asyncio.to_thread(self._route_and_execute, query, intent, start_time)
+    
+    def _print_header(self, query: str):
         print(f"\n{'='*70}")
         print(f"ORCHESTRATOR: Processing Query")
         print(f"{'='*70}")
         print(f"Query: {query}\n")
-        
+    
+    def _route_and_execute(self, query: str, intent: Dict[str, Any], start_time: datetime) -> Dict[str, Any]:
+        """Select the agent for a parsed intent, run it and build the result"""
         try:
-            intent = self.parser.parse(query, context)
-            
             if intent.get('status') != 'success':
                 return {
                     'status': 'error',
@@ -114,17 +145,20 @@ class EnhancedOrchestrator:
             }
             
         except Exception as e:
-            execution_time = (datetime.now() - start_time).total_seconds()
-            
-            print(f"ERROR: {str(e)}\n")
-            
-            return {
-                'status': 'error',
-                'error': str(e),
-                'query': query,
-                'execution_time': execution_time,
-                'timestamp': datetime.now().isoformat()
-            }
+            return self._error_result(query, e, start_time)
+    
+    def _error_result(self, query: str, error: Exception, start_time: datetime) -> Dict[str, Any]:
+        execution_time = (datetime.now() - start_time).total_seconds()
+        
+        print(f"ERROR: {str(error)}\n")
+        
+        return {
+            'status': 'error',
+            'error': str(error),
+            'query': query,
+            'execution_time': execution_time,
+            'timestamp': datetime.now().isoformat()
+        }
     
     def _select_agent(self, intent: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -385,7 +419,7 @@ class EnhancedOrchestrator:
     
     def get_execution_history(self) -> list:
         """Get execution history"""
-        return self.execution_history
+        return list(self.execution_history)
     
     def get_available_domains(self) -> Dict[str, Any]:
         """Get list of available domains"""
@@ -10,6 +10,9 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 import json
 import re
+from collections import deque
+
+from processing_layer.agents.core.base_agent import MAX_HISTORY
 
 # Add project to path
 project_path = os.path.dirname(os.path.abspath(__file__))
@@ -27,7 +30,7 @@ except:
     class BaseAgent:
         def __init__(self, name):
             self.name = name
-            self.execution_history = []
+            self.execution_history = deque(maxlen=MAX_HISTORY)
         
         def _log_decision(self, decision, reason):
             self.execution_history.append({
@@ -41,7 +44,7 @@ except:
             return datetime.now().isoformat()
         
         def get_execution_history(self):
-            return self.execution_history
+            return list(self.execution_history)
 
 
 class WorkflowPlannerAgent(BaseAgent):
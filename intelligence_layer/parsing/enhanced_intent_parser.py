@@ -5,10 +5,17 @@ Replaces the existing intent_parser_agent.py with enhanced functionality
 """
 
 from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import json
 from datetime import datetime
 
 
+# Domain classification and variable extraction are independent LLM calls,
+# so parse() runs the classifier here while extracting on the caller thread
+_classify_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="intent-classify")
+
+
 class EnhancedIntentParser:
     """
     Enhanced Intent Parser
@@ -73,10 +80,33 @@ class EnhancedIntentParser:
         print(f"PARSING QUERY: {query}")
         print(f"{'='*70}\n")
         
-        domain_result = self.domain_classifier.classify(query)
-        print(f"Domain: {domain_result['domain']} (confidence: {domain_result['confidence']:.2f})")
-        
+        domain_future = _classify_executor.submit(self.domain_classifier.classify, query)
         variables = self.variable_extractor.extract(query)
+        domain_result = domain_future.result()
+        
+        return self._build_intent(query, context, domain_result, variables)
+    
+    async def aparse(self, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Async version of parse(): classification and extraction run as
+        concurrent tasks, so wall time is the slower of the two LLM calls
+        """
+        context = context or {}
+        
+        print(f"\n{'='*70}")
+        print(f"PARSING QUERY: {query}")
+        print(f"{'='*70}\n")
+        
+        async with asyncio.TaskGroup() as tg:
+            domain_task = tg.create_task(asyncio.to_thread(self.domain_classifier.classify, query))
+            variables_task = tg.create_task(asyncio.to_thread(self.variable_extractor.extract, query))
+        
+        return self._build_intent(query, context, domain_task.result(), variables_task.result())
+    
+    def _build_intent(self, query: str, context: Dict[str, Any],
+                      domain_result: Dict[str, Any], variables: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine classification and extracted variables into an intent"""
+        print(f"Domain: {domain_result['domain']} (confidence: {domain_result['confidence']:.2f})")
         print(f"Variables extracted: {len(variables)} categories")
         
         report_type = self._infer_report_type(domain_result['domain'], variables, query)
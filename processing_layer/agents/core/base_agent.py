@@ -5,11 +5,15 @@ All agents must inherit from this and implement execute()
 
 from typing import Dict, Any, Optional
 from abc import ABC, abstractmethod
+from collections import deque
 from shared.config.logging_config import get_logger
 
 
 logger = get_logger(__name__)
 
+# Agents are long-lived singletons in the API, so keep only recent decisions
+MAX_HISTORY = 100
+
 
 class BaseAgent(ABC):
     """
@@ -26,7 +30,7 @@ class BaseAgent(ABC):
     def __init__(self, agent_name: str):
         self.agent_name = agent_name
         self.logger = logger
-        self.execution_history = []
+        self.execution_history = deque(maxlen=MAX_HISTORY)
     
     @abstractmethod
     def execute(self, input_data: Any, params: Dict[str, Any] = None) -> Any:
@@ -62,7 +66,7 @@ class BaseAgent(ABC):
     
     def get_execution_history(self) -> list:
         """Get history of decisions made during execution"""
-        return self.execution_history
+        return list(self.execution_history)
     
     def get_metadata(self) -> Dict[str, Any]:
         """
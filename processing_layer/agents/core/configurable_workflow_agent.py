@@ -3,7 +3,7 @@ Configurable Workflow Agent
 Executes visual workflows from frontend
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from collections import deque, defaultdict
 from processing_layer.agents.core.base_agent import BaseAgent, register_agent
 from processing_layer.workflows.nodes import NodeRegistry
@@ -47,6 +47,9 @@ class ConfigurableWorkflowAgent(BaseAgent):
         """
         super().__init__("ConfigurableWorkflowAgent")
         self.workflow_config = workflow_config or {}
+        
+        # Compiled plan for the default workflow, built on first execute
+        self._default_plan = None
     
     def execute(self, input_data: Any = None, params: Dict[str, Any] = None) -> Dict[str, Any]:
         """
@@ -91,8 +94,15 @@ class ConfigurableWorkflowAgent(BaseAgent):
         )
         
         try:
-            # Build execution order (topological sort)
-            execution_order = self._topological_sort(nodes, edges)
+            # The default workflow never changes, so compile it only once
+            if workflow_config is self.workflow_config:
+                if self._default_plan is None:
+                    self._default_plan = self._compile(nodes, edges)
+                plan = self._default_plan
+            else:
+                plan = self._compile(nodes, edges)
+            
+            execution_order, node_index, incoming = plan
             
             self._log_decision(
                 "Execution order determined",
@@ -104,13 +114,13 @@ class ConfigurableWorkflowAgent(BaseAgent):
             
             for node_id in execution_order:
                 # Get node definition
-                node_def = next((n for n in nodes if n['id'] == node_id), None)
+                node_def = node_index.get(node_id)
                 
                 if not node_def:
                     raise ValueError(f"Node {node_id} not found in definitions")
                 
                 # Get input data for this node
-                input_for_node = self._get_node_input(node_id, edges, node_outputs, input_data)
+                input_for_node = self._get_node_input(incoming[node_id], node_outputs, input_data)
                 
                 # Execute node
                 result = self._execute_node(node_def, input_for_node, params)
@@ -143,6 +153,26 @@ class ConfigurableWorkflowAgent(BaseAgent):
                 'execution_history': self.get_execution_history()
             }
     
+    def _compile(self, nodes: List[Dict], edges: List[Dict]) -> Tuple[List[str], Dict[str, Dict], Dict[str, List[str]]]:
+        """
+        Precompute everything execute() needs from the graph structure
+        
+        Args:
+            nodes: List of node definitions
+            edges: List of edge definitions
+            
+        Returns:
+            (execution order, node_id -> definition, node_id -> source node IDs)
+        """
+        execution_order = self._topological_sort(nodes, edges)
+        node_index = {node['id']: node for node in nodes}
+        
+        incoming = defaultdict(list)
+        for edge in edges:
+            incoming[edge['target']].append(edge['source'])
+        
+        return execution_order, node_index, incoming
+    
     def _topological_sort(self, nodes: List[Dict], edges: List[Dict]) -> List[str]:
         """
         Topological sort for DAG execution order
@@ -193,35 +223,30 @@ class ConfigurableWorkflowAgent(BaseAgent):
         
         return result
     
-    def _get_node_input(self, node_id: str, edges: List[Dict], outputs: Dict, initial_input: Any = None) -> Any:
+    def _get_node_input(self, sources: List[str], outputs: Dict, initial_input: Any = None) -> Any:
         """
         Get input data for node from previous nodes
         
         Args:
-            node_id: Current node ID
-            edges: Edge definitions
+            sources: IDs of nodes with edges pointing to this node
             outputs: Previous node outputs
             initial_input: Initial workflow input
             
         Returns:
             Input data for node
         """
-        # Find edges pointing to this node
-        incoming = [e for e in edges if e['target'] == node_id]
-        
         # If no incoming edges, use initial input
-        if not incoming:
+        if not sources:
             return initial_input
         
         # If single input, return directly
-        if len(incoming) == 1:
-            source = incoming[0]['source']
-            return outputs.get(source)
+        if len(sources) == 1:
+            return outputs.get(sources[0])
         
         # If multiple inputs, return as dict
         return {
-            e['source']: outputs.get(e['source'])
-            for e in incoming
+            source: outputs.get(source)
+            for source in sources
         }
     
     def _execute_node(self, node_def: Dict, input_data: Any, params: Dict) -> Any:
@@ -165,73 +165,74 @@ class DocumentProcessingService:
                 inr_amount = total_amount
                 exchange_rate = 1.0
             
-            cursor = self.db.conn.cursor()
-            
-            try:
-                # Get line items if they exist
-                line_items = fields.get("line_items")
-                line_items_json = json.dumps(line_items) if line_items else None
-                
-                if target_table == "vendor_invoices":
-                    print(f"   💾 Saving to vendor_invoices...")
-                    
-                    cursor.execute("""
-                        INSERT INTO vendor_invoices (
-                            id, company_id, vendor_id, document_id,
-                            invoice_number, invoice_date, due_date,
-                            subtotal_amount, tax_amount, total_amount,
-                            paid_amount, outstanding_amount,
-                            original_currency, exchange_rate, inr_amount,
-                            payment_status, payment_terms_days, line_items
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """, (
-                        transaction_id, self.company_id, master_data_ids.get("vendor_id"),
-                        document_id, fields.get("invoice_number"), invoice_date, due_date,
-                        subtotal, tax_amount, total_amount, paid_amount, outstanding,
-                        currency, exchange_rate, inr_amount,
-                        "unpaid" if outstanding > 0 else "paid", payment_terms, line_items_json
-                    ))
-                    
-                    self.db.conn.commit()
-                    print(f"   ✅ Saved: {currency} {total_amount:.2f} = INR ₹{inr_amount:.2f}")
-                    if line_items:
-                        print(f"   📦 Line items: {len(line_items)} items saved")
+            with self.db.connection() as conn:
+                cursor = conn.cursor()
                 
-                elif target_table == "customer_invoices":
-                    print(f"   💾 Saving to customer_invoices...")
+                try:
+                    # Get line items if they exist
+                    line_items = fields.get("line_items")
+                    line_items_json = json.dumps(line_items) if line_items else None
                     
-                    # Ensure invoice_number is not null
-                    invoice_number = fields.get("invoice_number") or f"DOC-{transaction_id[:8]}"
+                    if target_table == "vendor_invoices":
+                        print(f"   💾 Saving to vendor_invoices...")
+                        
+                        cursor.execute("""
+                            INSERT INTO vendor_invoices (
+                                id, company_id, vendor_id, document_id,
+                                invoice_number, invoice_date, due_date,
+                                subtotal_amount, tax_amount, total_amount,
+                                paid_amount, outstanding_amount,
+                                original_currency, exchange_rate, inr_amount,
+                                payment_status, payment_terms_days, line_items
+                            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        """, (
+                            transaction_id, self.company_id, master_data_ids.get("vendor_id"),
+                            document_id, fields.get("invoice_number"), invoice_date, due_date,
+                            subtotal, tax_amount, total_amount, paid_amount, outstanding,
+                            currency, exchange_rate, inr_amount,
+                            "unpaid" if outstanding > 0 else "paid", payment_terms, line_items_json
+                        ))
+                        
+                        conn.commit()
+                        print(f"   ✅ Saved: {currency} {total_amount:.2f} = INR ₹{inr_amount:.2f}")
+                        if line_items:
+                            print(f"   📦 Line items: {len(line_items)} items saved")
                     
-                    cursor.execute("""
-                        INSERT INTO customer_invoices (
-                            id, company_id, customer_id, document_id,
-                            invoice_number, invoice_date, due_date,
-                            subtotal_amount, tax_amount, total_amount,
-                            received_amount, outstanding_amount,
-                            original_currency, exchange_rate, inr_amount,
-                            payment_status, payment_terms_days, line_items
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """, (
-                        transaction_id, self.company_id, master_data_ids.get("customer_id"),
-                        document_id, invoice_number, invoice_date, due_date,
-                        subtotal, tax_amount, total_amount, paid_amount, outstanding,
-                        currency, exchange_rate, inr_amount,
-                        "unpaid" if outstanding > 0 else "paid", payment_terms, line_items_json
-                    ))
+                    elif target_table == "customer_invoices":
+                        print(f"   💾 Saving to customer_invoices...")
+                        
+                        # Ensure invoice_number is not null
+                        invoice_number = fields.get("invoice_number") or f"DOC-{transaction_id[:8]}"
+                        
+                        cursor.execute("""
+                            INSERT INTO customer_invoices (
+                                id, company_id, customer_id, document_id,
+                                invoice_number, invoice_date, due_date,
+                                subtotal_amount, tax_amount, total_amount,
+                                received_amount, outstanding_amount,
+                                original_currency, exchange_rate, inr_amount,
+                                payment_status, payment_terms_days, line_items
+                            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        """, (
+                            transaction_id, self.company_id, master_data_ids.get("customer_id"),
+                            document_id, invoice_number, invoice_date, due_date,
+                            subtotal, tax_amount, total_amount, paid_amount, outstanding,
+                            currency, exchange_rate, inr_amount,
+                            "unpaid" if outstanding > 0 else "paid", payment_terms, line_items_json
+                        ))
+                        
+                        conn.commit()
+                        print(f"   ✅ Saved: {currency} {total_amount:.2f} = INR ₹{inr_amount:.2f}")
+                        if line_items:
+                            print(f"   📦 Line items: {len(line_items)} items saved")
                     
-                    self.db.conn.commit()
-                    print(f"   ✅ Saved: {currency} {total_amount:.2f} = INR ₹{inr_amount:.2f}")
-                    if line_items:
-                        print(f"   📦 Line items: {len(line_items)} items saved")
-                
-                cursor.close()
-            except Exception as e:
-                print(f"   ❌ Error: {e}")
-                self.db.conn.rollback()
-                import traceback
-                traceback.print_exc()
-                return None
+                    cursor.close()
+                except Exception as e:
+                    print(f"   ❌ Error: {e}")
+                    conn.rollback()
+                    import traceback
+                    traceback.print_exc()
+                    return None
             
             return transaction_id
     
@@ -318,10 +319,13 @@ class DocumentProcessingService:
         
         return classification
     
-    def process_upload(self, file_path: str, file_name: str) -> Dict[str, Any]:
+    def process_upload(self, file_path: str, file_name: str, docling_output: Optional[Dict] = None) -> Dict[str, Any]:
         """
         Process uploaded document through complete pipeline
         FIXED VERSION - Updates target table based on classification
+        
+        docling_output: parser output produced elsewhere (e.g. in a process
+        pool); when omitted the document is parsed here with docling_parser
         """
         
         result = {
@@ -336,7 +340,8 @@ class DocumentProcessingService:
         try:
             # Step 1: Parse document
             print(f"[1/7] Parsing document...")
-            docling_output = self._parse_document(file_path)
+            if docling_output is None:
+                docling_output = self._parse_document(file_path)
             
             if not docling_output:
                 result["errors"].append("Failed to parse document")
@@ -1057,48 +1057,49 @@ class MasterDataManager:
             print(f"   âš ï¸ Missing vendor_name or company_id")
             return None
         
-        cursor = self.db.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
-        try:
-            # Try to find existing vendor (case-insensitive match)
-            cursor.execute("""
-                SELECT id FROM vendors 
-                WHERE company_id = %s 
-                AND LOWER(vendor_name) = LOWER(%s)
-                LIMIT 1
-            """, (company_id, vendor_name))
-            
-            row = cursor.fetchone()
+        with self.db.connection() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
             
-            if row:
-                vendor_id = row['id']
-                print(f"   ðŸ“‡ Found existing vendor: {vendor_name} ({vendor_id})")
-            else:
-                # Create new vendor
-                vendor_id = str(uuid.uuid4())
+            try:
+                # Try to find existing vendor (case-insensitive match)
+                cursor.execute("""
+                    SELECT id FROM vendors 
+                    WHERE company_id = %s 
+                    AND LOWER(vendor_name) = LOWER(%s)
+                    LIMIT 1
+                """, (company_id, vendor_name))
                 
-                # Extract additional data if available
-                vendor_code = None
-                if extracted_data:
-                    vendor_code = extracted_data.get('vendor_code')
+                row = cursor.fetchone()
                 
-                cursor.execute("""
-                    INSERT INTO vendors (
-                        id, company_id, vendor_name, vendor_code, is_active, created_at
-                    ) VALUES (%s, %s, %s, %s, %s, NOW())
-                """, (vendor_id, company_id, vendor_name, vendor_code, True))
+                if row:
+                    vendor_id = row['id']
+                    print(f"   ðŸ“‡ Found existing vendor: {vendor_name} ({vendor_id})")
+                else:
+                    # Create new vendor
+                    vendor_id = str(uuid.uuid4())
+                    
+                    # Extract additional data if available
+                    vendor_code = None
+                    if extracted_data:
+                        vendor_code = extracted_data.get('vendor_code')
+                    
+                    cursor.execute("""
+                        INSERT INTO vendors (
+                            id, company_id, vendor_name, vendor_code, is_active, created_at
+                        ) VALUES (%s, %s, %s, %s, %s, NOW())
+                    """, (vendor_id, company_id, vendor_name, vendor_code, True))
+                    
+                    conn.commit()
+                    print(f"   ðŸ“‡ Created new vendor: {vendor_name} ({vendor_id})")
                 
-                self.db.conn.commit()
-                print(f"   ðŸ“‡ Created new vendor: {vendor_name} ({vendor_id})")
-            
-            return vendor_id
-            
-        except Exception as e:
-            print(f"   âŒ Error creating/getting vendor: {e}")
-            self.db.conn.rollback()
-            return None
-        finally:
-            cursor.close()
+                return vendor_id
+                
+            except Exception as e:
+                print(f"   âŒ Error creating/getting vendor: {e}")
+                conn.rollback()
+                return None
+            finally:
+                cursor.close()
     
     def get_or_create_customer(self, customer_name: str, company_id: str, extracted_data: Dict = None) -> str:
         """
@@ -1116,48 +1117,49 @@ class MasterDataManager:
             print(f"   âš ï¸ Missing customer_name or company_id")
             return None
         
-        cursor = self.db.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
-        try:
-            # Try to find existing customer (case-insensitive match)
-            cursor.execute("""
-                SELECT id FROM customers 
-                WHERE company_id = %s 
-                AND LOWER(customer_name) = LOWER(%s)
-                LIMIT 1
-            """, (company_id, customer_name))
-            
-            row = cursor.fetchone()
+        with self.db.connection() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
             
-            if row:
-                customer_id = row['id']
-                print(f"   ðŸ“‡ Found existing customer: {customer_name} ({customer_id})")
-            else:
-                # Create new customer
-                customer_id = str(uuid.uuid4())
+            try:
+                # Try to find existing customer (case-insensitive match)
+                cursor.execute("""
+                    SELECT id FROM customers 
+                    WHERE company_id = %s 
+                    AND LOWER(customer_name) = LOWER(%s)
+                    LIMIT 1
+                """, (company_id, customer_name))
                 
-                # Extract additional data if available
-                customer_code = None
-                if extracted_data:
-                    customer_code = extracted_data.get('customer_code')
+                row = cursor.fetchone()
                 
-                cursor.execute("""
-                    INSERT INTO customers (
-                        id, company_id, customer_name, customer_code, is_active, created_at
-                    ) VALUES (%s, %s, %s, %s, %s, NOW())
-                """, (customer_id, company_id, customer_name, customer_code, True))
+                if row:
+                    customer_id = row['id']
+                    print(f"   ðŸ“‡ Found existing customer: {customer_name} ({customer_id})")
+                else:
+                    # Create new customer
+                    customer_id = str(uuid.uuid4())
+                    
+                    # Extract additional data if available
+                    customer_code = None
+                    if extracted_data:
+                        customer_code = extracted_data.get('customer_code')
+                    
+                    cursor.execute("""
+                        INSERT INTO customers (
+                            id, company_id, customer_name, customer_code, is_active, created_at
+                        ) VALUES (%s, %s, %s, %s, %s, NOW())
+                    """, (customer_id, company_id, customer_name, customer_code, True))
+                    
+                    conn.commit()
+                    print(f"   ðŸ“‡ Created new customer: {customer_name} ({customer_id})")
                 
-                self.db.conn.commit()
-                print(f"   ðŸ“‡ Created new customer: {customer_name} ({customer_id})")
-            
-            return customer_id
-            
-        except Exception as e:
-            print(f"   âŒ Error creating/getting customer: {e}")
-            self.db.conn.rollback()
-            return None
-        finally:
-            cursor.close()
+                return customer_id
+                
+            except Exception as e:
+                print(f"   âŒ Error creating/getting customer: {e}")
+                conn.rollback()
+                return None
+            finally:
+                cursor.close()
     
     def get_or_create_bank_account(self, account_number: str, company_id: str) -> str:
         """Get existing bank account or create new one"""
@@ -0,0 +1,52 @@
+"""
+Document Parse Worker
+Top-level parse entry point for running Docling/CSV parsing in a process pool
+
+Parsing is CPU-bound (layout analysis, OCR), so API servers submit it to a
+ProcessPoolExecutor instead of running it on a request thread. Everything
+here is importable and picklable on its own, which the "spawn" start method
+requires. Classification, extraction and database writes stay in the server
+process.
+"""
+
+from typing import Dict, Any, Optional
+from shared.config.logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+# Parsers built inside each pool process on first use and reused after that
+_parsers: Dict[str, Any] = {}
+
+
+def _get_parser(kind: str):
+    parser = _parsers.get(kind)
+    if parser is None:
+        if kind == "csv":
+            from processing_layer.document_processing.parsers.csv_parser import CSVParser
+            parser = CSVParser()
+        else:
+            from processing_layer.document_processing.parsers.universal_docling_parser import UniversalDoclingParser
+            parser = UniversalDoclingParser()
+        _parsers[kind] = parser
+    return parser
+
+
+def parse_document(file_path: str, file_ext: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse one document (runs inside a pool process)
+
+    Args:
+        file_path: Path to the saved upload
+        file_ext: Lowercased extension including the dot, e.g. ".pdf"
+
+    Returns:
+        Parser output (plain dict), or None if parsing failed or produced nothing
+    """
+    kind = "csv" if file_ext == ".csv" else "docling"
+    try:
+        return _get_parser(kind).parse(file_path)
+    except Exception as e:
+        # The API answers 422 for None; the traceback stays in this log
+        logger.error("Parsing %s failed: %s", file_path, e, exc_info=True)
+        return None
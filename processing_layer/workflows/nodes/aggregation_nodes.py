@@ -56,13 +56,14 @@ class GroupingNode(BaseNode):
         
         group_by = params.get('group_by', 'aging_bucket')
         
-        # Group records
+        # Group records (one dict lookup per record, then work on the bucket directly)
         groups = {}
         for record in records:
             key = record.get(group_by, 'Unknown')
             
-            if key not in groups:
-                groups[key] = {
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {
                     'group_name': key,
                     'records': [],
                     'count': 0,
@@ -70,10 +71,10 @@ class GroupingNode(BaseNode):
                     'total_outstanding': 0
                 }
             
-            groups[key]['records'].append(record)
-            groups[key]['count'] += 1
-            groups[key]['total_amount'] += float(record.get('inr_amount', 0))
-            groups[key]['total_outstanding'] += float(record.get('outstanding', 0))
+            group['records'].append(record)
+            group['count'] += 1
+            group['total_amount'] += float(record.get('inr_amount', 0))
+            group['total_outstanding'] += float(record.get('outstanding', 0))
         
         # Convert to list and sort
         groups_list = list(groups.values())
@@ -169,18 +170,20 @@ class SummaryNode(BaseNode):
                 }
             }
         
-        # Calculate statistics
+        # Calculate statistics (records is non-empty here)
         amounts = [float(r.get(amount_field, 0)) for r in records]
-        outstanding_amounts = [float(r.get('outstanding', 0)) for r in records]
+        total_amount = sum(amounts)
+        total_outstanding = sum(float(r.get('outstanding', 0)) for r in records)
+        count = len(records)
         
         summary = {
-            'total_records': len(records),
-            'total_amount': sum(amounts),
-            'total_outstanding': sum(outstanding_amounts),
-            'average_amount': sum(amounts) / len(amounts) if amounts else 0,
-            'min_amount': min(amounts) if amounts else 0,
-            'max_amount': max(amounts) if amounts else 0,
-            'average_outstanding': sum(outstanding_amounts) / len(outstanding_amounts) if outstanding_amounts else 0
+            'total_records': count,
+            'total_amount': total_amount,
+            'total_outstanding': total_outstanding,
+            'average_amount': total_amount / count,
+            'min_amount': min(amounts),
+            'max_amount': max(amounts),
+            'average_outstanding': total_outstanding / count
         }
         
         return {
@@ -3,15 +3,25 @@ Base Node Class - Pure Function Interface
 All nodes must inherit from this and implement run()
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, Mapping
 from abc import ABC, abstractmethod
 from datetime import datetime
+from types import MappingProxyType
 from shared.config.logging_config import get_logger
 
 
 logger = get_logger(__name__)
 
 
+def _read_only(value):
+    """Read-only copy of node metadata: dicts become MappingProxyType, lists tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _read_only(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_read_only(item) for item in value)
+    return value
+
+
 class BaseNode(ABC):
     """
     Base class for all nodes (tools)
@@ -74,12 +84,16 @@ class NodeRegistry:
     """
     
     _nodes = {}
+    _metadata_cache = None
+    _category_cache = None
     
     @classmethod
     def register(cls, node_class):
         """Register a node class"""
         node_type = node_class.__name__
         cls._nodes[node_type] = node_class
+        cls._metadata_cache = None
+        cls._category_cache = None
         logger.info(f"Registered node: {node_type}")
         return node_class
     
@@ -91,28 +105,32 @@ class NodeRegistry:
         return cls._nodes[node_type]()
     
     @classmethod
-    def get_all_nodes(cls) -> Dict[str, Any]:
-        """Get all registered nodes"""
-        return {
-            node_type: node_class().get_metadata()
-            for node_type, node_class in cls._nodes.items()
-        }
+    def get_all_nodes(cls) -> Mapping[str, Any]:
+        """
+        Get all registered nodes
+        
+        Node metadata is static, so it is built once and reused until
+        another node is registered. Every caller shares the result, so it
+        is read-only (MappingProxyType/tuples); copy it to change it.
+        """
+        if cls._metadata_cache is None:
+            cls._metadata_cache = _read_only({
+                node_type: node_class().get_metadata()
+                for node_type, node_class in cls._nodes.items()
+            })
+        return cls._metadata_cache
     
     @classmethod
-    def get_nodes_by_category(cls) -> Dict[str, List[Dict]]:
-        """Get nodes grouped by category"""
-        categories = {}
-        for node_type, node_class in cls._nodes.items():
-            node = node_class()
-            metadata = node.get_metadata()
-            category = metadata['category']
-            
-            if category not in categories:
-                categories[category] = []
-            
-            categories[category].append(metadata)
-        
-        return categories
+    def get_nodes_by_category(cls) -> Mapping[str, tuple]:
+        """Get nodes grouped by category (cached and read-only like get_all_nodes)"""
+        if cls._category_cache is None:
+            categories = {}
+            for metadata in cls.get_all_nodes().values():
+                categories.setdefault(metadata['category'], []).append(metadata)
+            cls._category_cache = MappingProxyType(
+                {category: tuple(nodes) for category, nodes in categories.items()}
+            )
+        return cls._category_cache
 
 
 # Decorator to auto-register nodes
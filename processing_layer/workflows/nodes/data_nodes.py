@@ -66,122 +66,123 @@ class InvoiceFetchNode(BaseNode):
             user_settings = settings_mgr.get_user_settings("default")
             company_id = user_settings.get("company_id") if user_settings else None
 
-        cursor = self.db.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        invoices = []
+        with self.db.connection() as conn:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            invoices = []
 
-        try:
-            if category == "purchase":
-                query = """
-                    SELECT 
-                        vi.id,
-                        vi.invoice_number,
-                        vi.invoice_date,
-                        vi.due_date,
-                        vi.subtotal_amount,
-                        vi.tax_amount,
-                        vi.total_amount,
-                        vi.paid_amount,
-                        vi.outstanding_amount,
-                        vi.original_currency,
-                        vi.exchange_rate,
-                        vi.inr_amount,
-                        vi.payment_status,
-                        vi.payment_terms_days,
-                        vi.vendor_id,
-                        v.vendor_name,
-                        d.file_name,
-                        vi.created_at
-                    FROM vendor_invoices vi
-                    LEFT JOIN vendors v ON vi.vendor_id = v.id
-                    LEFT JOIN documents d ON vi.document_id = d.id
-                    WHERE vi.company_id = %s
-                    ORDER BY vi.invoice_date DESC NULLS LAST
-                """
-                cursor.execute(query, (company_id,))
-                rows = cursor.fetchall()
+            try:
+                if category == "purchase":
+                    query = """
+                        SELECT 
+                            vi.id,
+                            vi.invoice_number,
+                            vi.invoice_date,
+                            vi.due_date,
+                            vi.subtotal_amount,
+                            vi.tax_amount,
+                            vi.total_amount,
+                            vi.paid_amount,
+                            vi.outstanding_amount,
+                            vi.original_currency,
+                            vi.exchange_rate,
+                            vi.inr_amount,
+                            vi.payment_status,
+                            vi.payment_terms_days,
+                            vi.vendor_id,
+                            v.vendor_name,
+                            d.file_name,
+                            vi.created_at
+                        FROM vendor_invoices vi
+                        LEFT JOIN vendors v ON vi.vendor_id = v.id
+                        LEFT JOIN documents d ON vi.document_id = d.id
+                        WHERE vi.company_id = %s
+                        ORDER BY vi.invoice_date DESC NULLS LAST
+                    """
+                    cursor.execute(query, (company_id,))
+                    rows = cursor.fetchall()
 
-                for row in rows:
-                    invoices.append({
-                        "id": row["id"],
-                        "invoice_number": row["invoice_number"],
-                        "invoice_date": row["invoice_date"].isoformat() if row["invoice_date"] else None,
-                        "due_date": row["due_date"].isoformat() if row["due_date"] else None,
-                        "vendor_id": row["vendor_id"],
-                        "vendor_name": row["vendor_name"] or "Unknown",
-                        "subtotal_amount": float(row["subtotal_amount"] or 0),
-                        "tax_amount": float(row["tax_amount"] or 0),
-                        "total_amount": float(row["total_amount"] or 0),
-                        "paid_amount": float(row["paid_amount"] or 0),
-                        "outstanding_amount": float(row["outstanding_amount"] or 0),
-                        "original_currency": row["original_currency"],
-                        "exchange_rate": float(row["exchange_rate"] or 1.0),
-                        "inr_amount": float(row["inr_amount"] or 0),
-                        "payment_status": row["payment_status"],
-                        "payment_terms_days": row["payment_terms_days"],
-                        "file_name": row["file_name"],
-                        "category": "purchase",
-                        "created_at": row["created_at"].isoformat() if row["created_at"] else None
-                    })
+                    for row in rows:
+                        invoices.append({
+                            "id": row["id"],
+                            "invoice_number": row["invoice_number"],
+                            "invoice_date": row["invoice_date"].isoformat() if row["invoice_date"] else None,
+                            "due_date": row["due_date"].isoformat() if row["due_date"] else None,
+                            "vendor_id": row["vendor_id"],
+                            "vendor_name": row["vendor_name"] or "Unknown",
+                            "subtotal_amount": float(row["subtotal_amount"] or 0),
+                            "tax_amount": float(row["tax_amount"] or 0),
+                            "total_amount": float(row["total_amount"] or 0),
+                            "paid_amount": float(row["paid_amount"] or 0),
+                            "outstanding_amount": float(row["outstanding_amount"] or 0),
+                            "original_currency": row["original_currency"],
+                            "exchange_rate": float(row["exchange_rate"] or 1.0),
+                            "inr_amount": float(row["inr_amount"] or 0),
+                            "payment_status": row["payment_status"],
+                            "payment_terms_days": row["payment_terms_days"],
+                            "file_name": row["file_name"],
+                            "category": "purchase",
+                            "created_at": row["created_at"].isoformat() if row["created_at"] else None
+                        })
 
-            elif category == "sales":
-                query = """
-                    SELECT 
-                        ci.id,
-                        ci.invoice_number,
-                        ci.invoice_date,
-                        ci.due_date,
-                        ci.subtotal_amount,
-                        ci.tax_amount,
-                        ci.total_amount,
-                        ci.received_amount,
-                        ci.outstanding_amount,
-                        ci.original_currency,
-                        ci.exchange_rate,
-                        ci.inr_amount,
-                        ci.payment_status,
-                        ci.payment_terms_days,
-                        ci.customer_id,
-                        c.customer_name,
-                        d.file_name,
-                        ci.created_at
-                    FROM customer_invoices ci
-                    LEFT JOIN customers c ON ci.customer_id = c.id
-                    LEFT JOIN documents d ON ci.document_id = d.id
-                    WHERE ci.company_id = %s
-                    ORDER BY ci.invoice_date DESC NULLS LAST
-                """
-                cursor.execute(query, (company_id,))
-                rows = cursor.fetchall()
+                elif category == "sales":
+                    query = """
+                        SELECT 
+                            ci.id,
+                            ci.invoice_number,
+                            ci.invoice_date,
+                            ci.due_date,
+                            ci.subtotal_amount,
+                            ci.tax_amount,
+                            ci.total_amount,
+                            ci.received_amount,
+                            ci.outstanding_amount,
+                            ci.original_currency,
+                            ci.exchange_rate,
+                            ci.inr_amount,
+                            ci.payment_status,
+                            ci.payment_terms_days,
+                            ci.customer_id,
+                            c.customer_name,
+                            d.file_name,
+                            ci.created_at
+                        FROM customer_invoices ci
+                        LEFT JOIN customers c ON ci.customer_id = c.id
+                        LEFT JOIN documents d ON ci.document_id = d.id
+                        WHERE ci.company_id = %s
+                        ORDER BY ci.invoice_date DESC NULLS LAST
+                    """
+                    cursor.execute(query, (company_id,))
+                    rows = cursor.fetchall()
 
-                for row in rows:
-                    invoices.append({
-                        "id": row["id"],
-                        "invoice_number": row["invoice_number"],
-                        "invoice_date": row["invoice_date"].isoformat() if row["invoice_date"] else None,
-                        "due_date": row["due_date"].isoformat() if row["due_date"] else None,
-                        "customer_id": row["customer_id"],
-                        "customer_name": row["customer_name"] or "Unknown",
-                        "subtotal_amount": float(row["subtotal_amount"] or 0),
-                        "tax_amount": float(row["tax_amount"] or 0),
-                        "total_amount": float(row["total_amount"] or 0),
-                        "received_amount": float(row["received_amount"] or 0),
-                        "outstanding_amount": float(row["outstanding_amount"] or 0),
-                        "original_currency": row["original_currency"],
-                        "exchange_rate": float(row["exchange_rate"] or 1.0),
-                        "inr_amount": float(row["inr_amount"] or 0),
-                        "payment_status": row["payment_status"],
-                        "payment_terms_days": row["payment_terms_days"],
-                        "file_name": row["file_name"],
-                        "category": "sales",
-                        "created_at": row["created_at"].isoformat() if row["created_at"] else None
-                    })
+                    for row in rows:
+                        invoices.append({
+                            "id": row["id"],
+                            "invoice_number": row["invoice_number"],
+                            "invoice_date": row["invoice_date"].isoformat() if row["invoice_date"] else None,
+                            "due_date": row["due_date"].isoformat() if row["due_date"] else None,
+                            "customer_id": row["customer_id"],
+                            "customer_name": row["customer_name"] or "Unknown",
+                            "subtotal_amount": float(row["subtotal_amount"] or 0),
+                            "tax_amount": float(row["tax_amount"] or 0),
+                            "total_amount": float(row["total_amount"] or 0),
+                            "received_amount": float(row["received_amount"] or 0),
+                            "outstanding_amount": float(row["outstanding_amount"] or 0),
+                            "original_currency": row["original_currency"],
+                            "exchange_rate": float(row["exchange_rate"] or 1.0),
+                            "inr_amount": float(row["inr_amount"] or 0),
+                            "payment_status": row["payment_status"],
+                            "payment_terms_days": row["payment_terms_days"],
+                            "file_name": row["file_name"],
+                            "category": "sales",
+                            "created_at": row["created_at"].isoformat() if row["created_at"] else None
+                        })
 
-        except Exception as e:
-            self.logger.error(f"Error fetching invoices: {e}")
-            import traceback
-            traceback.print_exc()
-        finally:
-            cursor.close()
+            except Exception as e:
+                self.logger.error(f"Error fetching invoices: {e}")
+                import traceback
+                traceback.print_exc()
+            finally:
+                cursor.close()
 
         # -------------------------------
         # SAFE, EXPLICIT FILTERING LAYER
@@ -0,0 +1,207 @@
+"""
+Semantic LLM Cache
+Reuses LLM results for queries that are worded differently but mean the same thing
+
+Lookups go exact-match first (normalized text, O(1)), then nearest neighbour
+over sentence embeddings. Entries are scoped per company, expire after a TTL
+and are evicted least-recently-used.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+from shared.config.logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+_TOKEN = re.compile(r"\d+(?:\.\d+)?|[a-z0-9]+(?:['&.-][a-z0-9]+)*")
+
+# Words that change how a request is phrased but not what it asks for.
+# Everything else (vendors, numbers, "this"/"last", "month"/"quarter", ...)
+# must match exactly for a paraphrase to reuse a cached result.
+_FILLER = frozenset("""
+    a an the me my our us i we you your please can could would will kindly
+    show list display give get fetch find see view pull want need let
+    what which whats how is are was were do does did be of for from in on
+    to at by with and all any some up out just report reports
+""".split())
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace runs"""
+    return " ".join(query.lower().split())
+
+
+def query_signature(key: str) -> frozenset:
+    """
+    Tokens that have to match for two queries to share a result
+
+    "this month" / "last month" and "AWS" / "Google" embed almost
+    identically, so cosine similarity alone is not enough: a semantic hit
+    also needs the same numbers, period words, entities and other content
+    tokens. Only filler words may differ.
+    """
+    return frozenset(t for t in _TOKEN.findall(key) if t not in _FILLER)
+
+
+class _CompanyIndex:
+    """LRU entries for one company plus a lazily rebuilt embedding matrix"""
+
+    def __init__(self):
+        # normalized query -> (embedding, signature, value, expires_at)
+        self.entries: "OrderedDict[str, Tuple[Any, frozenset, Dict, float]]" = OrderedDict()
+        self.matrix = None
+        self.keys = []
+
+    def rebuild(self, np):
+        self.keys = list(self.entries)
+        self.matrix = (
+            np.stack([self.entries[k][0] for k in self.keys]).astype(np.float32)
+            if self.keys else None
+        )
+
+
+class SemanticLLMCache:
+    """
+    In-process semantic cache for LLM results
+
+    Usage:
+        cache = get_semantic_cache()
+        result = cache.get(query, company_id)
+        if result is None:
+            result = llm_call(query)
+            cache.set(query, company_id, result)
+
+    Both methods may run the embedding model, so call them from a worker
+    thread (run_in_threadpool) in async code.
+    """
+
+    def __init__(self,
+                 model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+                 threshold: float = 0.92,
+                 ttl: float = 3600,
+                 maxsize: int = 256):
+        self.model_name = model_name
+        self.threshold = threshold
+        self.ttl = ttl
+        self.maxsize = maxsize
+
+        self._companies: Dict[str, _CompanyIndex] = {}
+        self._lock = threading.Lock()
+        self._model = None
+        self._np = None
+        self._semantic_available = True
+
+    def _encoder(self):
+        """Load the embedding model on first use; None if unavailable"""
+        if self._model is None and self._semantic_available:
+            try:
+                import numpy as np
+                from sentence_transformers import SentenceTransformer
+                self._np = np
+                self._model = SentenceTransformer(self.model_name)
+                logger.info("Semantic cache model loaded: %s", self.model_name)
+            except Exception as e:
+                logger.warning("Semantic cache falling back to exact matches: %s", e)
+                self._semantic_available = False
+        return self._model
+
+    def _embed(self, text: str):
+        model = self._encoder()
+        if model is None:
+            return None
+        # Unit vectors, so the dot product is the cosine similarity.
+        # float16 halves memory; similarity is computed in float32.
+        return model.encode(text, normalize_embeddings=True).astype(self._np.float16)
+
+    def get(self, query: str, company_id: str) -> Optional[Dict[str, Any]]:
+        """Cached result for this query or a close paraphrase of it"""
+        key = normalize_query(query)
+        now = time.monotonic()
+
+        with self._lock:
+            index = self._companies.get(company_id)
+            if index is None:
+                return None
+
+            hit = index.entries.get(key)
+            if hit is not None and hit[3] > now:
+                index.entries.move_to_end(key)
+                return hit[2]
+            if not index.entries:
+                return None
+
+        embedding = self._embed(key)
+        if embedding is None:
+            return None
+
+        np = self._np
+        signature = query_signature(key)
+
+        with self._lock:
+            if index.matrix is None:
+                index.rebuild(np)
+            if index.matrix is None:
+                return None
+
+            scores = index.matrix @ embedding.astype(np.float32)
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+
+            entry = index.entries.get(index.keys[best])
+            # A paraphrase only counts if it names the same period, vendor,
+            # numbers, etc. - see query_signature
+            if entry is None or entry[3] <= now or entry[1] != signature:
+                return None
+
+            index.entries.move_to_end(index.keys[best])
+            logger.debug("Semantic cache hit (%.3f): %r ~ %r", scores[best], key, index.keys[best])
+            return entry[2]
+
+    def set(self, query: str, company_id: str, value: Dict[str, Any]):
+        """Store an LLM result for this query"""
+        key = normalize_query(query)
+        # None when the model is unavailable; get() then only matches exactly
+        embedding = self._embed(key)
+        now = time.monotonic()
+        signature = query_signature(key)
+
+        with self._lock:
+            index = self._companies.setdefault(company_id, _CompanyIndex())
+            index.entries[key] = (embedding, signature, value, now + self.ttl)
+            index.entries.move_to_end(key)
+
+            # Drop expired entries first, then the least recently used
+            expired = [k for k, e in index.entries.items() if e[3] <= now]
+            for k in expired:
+                del index.entries[k]
+            while len(index.entries) > self.maxsize:
+                index.entries.popitem(last=False)
+
+            index.matrix = None
+
+    def clear(self, company_id: str = None):
+        """Drop cached results for one company, or for all of them"""
+        with self._lock:
+            if company_id is None:
+                self._companies.clear()
+            else:
+                self._companies.pop(company_id, None)
+
+
+# Global cache instance
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_semantic_cache() -> SemanticLLMCache:
+    """Get or create the global semantic cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SemanticLLMCache()
+    return _cache
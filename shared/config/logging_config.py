@@ -3,16 +3,212 @@ Logging Configuration for Financial Automation System
 Provides structured logging throughout the application
 """
 
+import atexit
 import logging
+import multiprocessing
+import multiprocessing.util
+import os
+import queue
 import sys
+import threading
+import time
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, MemoryHandler
 from pathlib import Path
-from datetime import datetime
+
+
+LOG_DIR = Path("./logs")
+# 0 = console only. Set under gunicorn (see the Procfile), where the process
+# manager collects stdout from every worker into one stream.
+LOG_TO_FILE = os.getenv("LOG_TO_FILE", "1") == "1"
+LOG_MAX_BYTES = 50 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+# Files left by processes that have exited are deleted once this old
+LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", "7"))
+# Records buffered before a file write; an ERROR or worse flushes at once
+LOG_BUFFER_CAPACITY = 64
+# Longest a buffered record waits before it is written, in seconds
+LOG_FLUSH_INTERVAL = 2.0
+
+
+def log_file_path() -> Path:
+    """
+    Log file for the current process
+    
+    Replaces the old daily financial_automation_YYYYMMDD.log: each API
+    worker rotates its own financial_automation.<pid>.log, since several
+    processes rotating one shared file lose and misplace records.
+    """
+    return LOG_DIR / f"financial_automation.{os.getpid()}.log"
+
+
+def _writes_log_file() -> bool:
+    # multiprocessing children (the spawned parse pool) log to the console
+    # only, so pool restarts don't leave a file set per short-lived process
+    # (the name is set before a spawned child imports anything; parent_process()
+    # only once it starts running)
+    return LOG_TO_FILE and multiprocessing.current_process().name == "MainProcess"
+
+
+def prune_stale_logs(max_age_days: int = LOG_RETENTION_DAYS):
+    """Delete log files of exited processes that have not been written to in max_age_days"""
+    cutoff = time.time() - max_age_days * 86400
+    for path in LOG_DIR.glob("financial_automation.*.log*"):
+        pid = path.name.split(".")[1]
+        if not pid.isdigit() or int(pid) == os.getpid():
+            continue
+        try:
+            if path.stat().st_mtime >= cutoff:
+                continue
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            path.unlink(missing_ok=True)
+        except OSError:
+            # Still running under another user (PermissionError) or already gone
+            continue
+
+
+class TimedMemoryHandler(MemoryHandler):
+    """MemoryHandler that also flushes once its oldest record is LOG_FLUSH_INTERVAL old"""
+    
+    def __init__(self, capacity, flush_interval, **kwargs):
+        super().__init__(capacity, **kwargs)
+        self.flush_interval = flush_interval
+        self._oldest = None
+    
+    def shouldFlush(self, record):
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        return (super().shouldFlush(record)
+                or time.monotonic() - self._oldest >= self.flush_interval)
+    
+    def flush(self):
+        self.acquire()
+        try:
+            super().flush()
+            self._oldest = None
+        finally:
+            self.release()
 
 
 class LoggerSetup:
     """Configure application-wide logging"""
     
+    _queue = None
+    _queue_handler = None
+    _listener = None
+    _file_handler = None
+    _lock = threading.Lock()
+    
+    @classmethod
+    def get_queue_handler(cls) -> QueueHandler:
+        """
+        Shared handler that only enqueues records
+        
+        A single QueueListener thread per process owns the console and file
+        handlers, so logging calls on request paths never wait on
+        stdout/file I/O.
+        """
+        with cls._lock:
+            if cls._queue_handler is None:
+                cls._queue = queue.SimpleQueue()
+                cls._queue_handler = QueueHandler(cls._queue)
+                cls._start_listener()
+                
+                # Drain the queue, then write out whatever is still buffered.
+                # atexit covers normal interpreter exit; multiprocessing
+                # children skip atexit and run their Finalize hooks instead.
+                atexit.register(cls.shutdown)
+                cls._register_finalizer(cls)
+                # A forked child inherits the queue but not the listener thread.
+                # multiprocessing clears Finalize hooks in its forked children
+                # after os-level fork hooks run, so re-register from its own hook.
+                os.register_at_fork(after_in_child=cls._restart_in_child)
+                multiprocessing.util.register_after_fork(cls, LoggerSetup._after_pool_fork)
+        
+        return cls._queue_handler
+    
+    @classmethod
+    def _start_listener(cls):
+        # Formatter
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+        
+        # Console handler
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(formatter)
+        handlers = [console_handler]
+        cls._file_handler = None
+        
+        if _writes_log_file():
+            # File handler: one per process, rotated by size
+            LOG_DIR.mkdir(exist_ok=True)
+            prune_stale_logs()
+            # delay: no file until the first record, so a process that
+            # turns out to be a pool worker never creates one
+            file_handler = RotatingFileHandler(
+                log_file_path(), maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, delay=True
+            )
+            file_handler.setFormatter(formatter)
+            
+            # Batch file writes; the console stays unbuffered
+            cls._file_handler = TimedMemoryHandler(
+                LOG_BUFFER_CAPACITY,
+                LOG_FLUSH_INTERVAL,
+                flushLevel=logging.ERROR,
+                target=file_handler
+            )
+            handlers.append(cls._file_handler)
+            
+            # shouldFlush only runs when a record arrives, so a quiet process
+            # needs this to get its last records on disk
+            threading.Thread(target=cls._flush_periodically, args=(cls._file_handler,),
+                             name="log-flush", daemon=True).start()
+        
+        cls._listener = QueueListener(cls._queue, *handlers)
+        cls._listener.start()
+    
+    @staticmethod
+    def _flush_periodically(handler: MemoryHandler):
+        while handler.target is not None:
+            time.sleep(LOG_FLUSH_INTERVAL)
+            handler.flush()
+    
+    @staticmethod
+    def _register_finalizer(cls):
+        multiprocessing.util.Finalize(None, cls.shutdown, exitpriority=0)
+    
+    @staticmethod
+    def _after_pool_fork(cls):
+        cls._register_finalizer(cls)
+        # Forked pool workers log to the console only, like spawned ones
+        # (see _writes_log_file); the file handler opened at fork is dropped
+        if cls._file_handler is not None and cls._listener is not None:
+            cls._listener.handlers = tuple(
+                h for h in cls._listener.handlers if h is not cls._file_handler
+            )
+            cls._file_handler.close()
+            cls._file_handler = None
+    
+    @classmethod
+    def _restart_in_child(cls):
+        cls._lock = threading.Lock()
+        if cls._queue_handler is not None:
+            cls._start_listener()
+    
+    @classmethod
+    def shutdown(cls):
+        """Stop the listener and flush buffered records (safe to call twice)"""
+        listener, cls._listener = cls._listener, None
+        if listener is not None:
+            listener.stop()
+        if cls._file_handler is not None:
+            cls._file_handler.close()
+    
     @staticmethod
+    @lru_cache(maxsize=None)
     def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
         """
         Set up a logger with both file and console handlers
@@ -22,7 +218,7 @@ class LoggerSetup:
             level: Logging level
             
         Returns:
-            Configured logger instance
+            Configured logger instance (memoized per name and level)
         """
         logger = logging.getLogger(name)
         logger.setLevel(level)
@@ -31,29 +227,8 @@ class LoggerSetup:
         if logger.handlers:
             return logger
         
-        # Console handler
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(level)
-        
-        # File handler
-        log_dir = Path("./logs")
-        log_dir.mkdir(exist_ok=True)
-        
-        log_file = log_dir / f"financial_automation_{datetime.now().strftime('%Y%m%d')}.log"
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(level)
-        
-        # Formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        
-        console_handler.setFormatter(formatter)
-        file_handler.setFormatter(formatter)
-        
-        logger.addHandler(console_handler)
-        logger.addHandler(file_handler)
+        # Records go to the shared queue; console + file writes happen off-thread
+        logger.addHandler(LoggerSetup.get_queue_handler())
         
         return logger
 
@@ -4,8 +4,14 @@ High-performance LLM client using Groq API
 """
 
 import os
+import json
+import hashlib
+import threading
+from functools import lru_cache
 from typing import Optional, Dict, Any
-from groq import Groq
+import httpx
+from cachetools import TTLCache
+from groq import Groq, DefaultHttpxClient
 from shared.config.logging_config import get_logger
 from dotenv import load_dotenv
 load_dotenv()
@@ -14,6 +20,41 @@ load_dotenv()
 logger = get_logger(__name__)
 
 
+# One keep-alive connection pool for every GroqClient in the process, so new
+# clients reuse warm TLS connections instead of opening their own
+_http_client: Optional[httpx.Client] = None
+_http_client_lock = threading.Lock()
+
+
+def get_shared_http_client() -> httpx.Client:
+    """Return the process-wide HTTP client used for Groq API calls"""
+    global _http_client
+    
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = DefaultHttpxClient(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+                timeout=httpx.Timeout(60.0, connect=10.0)
+            )
+    return _http_client
+
+
+# Completions for deterministic (temperature=0) calls, keyed on a hash of
+# everything that affects the output. Shared by all clients in the process.
+_response_cache = TTLCache(maxsize=1024, ttl=3600)
+_response_cache_lock = threading.Lock()
+
+
+def response_cache_key(model: str, prompt: str, max_tokens: int, json_mode: bool) -> str:
+    """SHA-256 key for a completion request"""
+    payload = json.dumps(
+        {"m": model, "p": prompt, "t": max_tokens, "j": json_mode},
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 class GroqClient:
     """
     Groq LLM client for financial document extraction
@@ -41,7 +82,7 @@ class GroqClient:
             )
         
         self.model = model
-        self.client = Groq(api_key=self.api_key)
+        self.client = Groq(api_key=self.api_key, http_client=get_shared_http_client())
         
         logger.info(f"Groq client initialized with model: {model}")
     
@@ -63,7 +104,18 @@ class GroqClient:
             
         Returns:
             Generated text
+            
+        Calls with temperature=0 are cached for an hour, since the same
+        prompt gives the same completion.
         """
+        cache_key = None
+        if temperature == 0:
+            cache_key = response_cache_key(self.model, prompt, max_tokens, json_mode)
+            with _response_cache_lock:
+                cached = _response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
             messages = [
                 {
@@ -88,8 +140,13 @@ class GroqClient:
                 kwargs["response_format"] = {"type": "json_object"}
             
             response = self.client.chat.completions.create(**kwargs)
+            content = response.choices[0].message.content
             
-            return response.choices[0].message.content
+            if cache_key is not None and content:
+                with _response_cache_lock:
+                    _response_cache[cache_key] = content
+            
+            return content
             
         except Exception as e:
             logger.error(f"Groq API error: {str(e)}")
@@ -195,13 +252,17 @@ GROQ_MODELS = {
 
 def get_groq_client(model_type: str = "default") -> GroqClient:
     """
-    Factory function to get Groq client with recommended model
+    Get the shared Groq client for a model type
     
     Args:
         model_type: Model type (accurate, balanced, fast, default)
         
     Returns:
-        Configured GroqClient
+        Configured GroqClient (one instance per model, reused across callers)
     """
-    model = GROQ_MODELS.get(model_type, GROQ_MODELS["default"])
+    return _client_for_model(GROQ_MODELS.get(model_type, GROQ_MODELS["default"]))
+
+
+@lru_cache(maxsize=4)
+def _client_for_model(model: str) -> GroqClient:
     return GroqClient(model=model)
\ No newline at end of file
@@ -0,0 +1,143 @@
+"""
+Async Profiler
+Optional await-time attribution for coroutines using sys.monitoring (Python 3.12+)
+
+Enabled with PROFILE_ASYNC=1. When it is off nothing is registered with
+sys.monitoring, so there is no runtime cost.
+"""
+
+import inspect
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, Any
+from shared.config.logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+_TOOL_NAME = "financial-automation-async-profiler"
+
+# Suspended coroutine frames tracked at once; the oldest is dropped beyond this
+MAX_SUSPENDED = 100_000
+
+
+class AsyncProfiler:
+    """
+    Aggregates how long each coroutine spends suspended at its awaits
+
+    PY_YIELD marks a coroutine frame as suspended, PY_RESUME (or PY_THROW,
+    e.g. a cancellation) closes the interval. PY_RETURN/PY_UNWIND drop the
+    frame's entry when it finishes, so coroutines closed while suspended
+    don't leak and a recycled frame id never inherits a stale start time.
+    Totals are kept per coroutine qualname.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._suspended_at: Dict[int, float] = {}
+        self._stats = defaultdict(lambda: [0, 0.0])  # qualname -> [suspensions, seconds]
+
+    def start(self) -> bool:
+        """Register the monitoring callbacks; returns False if unsupported"""
+        monitoring = getattr(sys, "monitoring", None)
+        if monitoring is None:
+            logger.warning("Async profiling needs Python 3.12+ (sys.monitoring); not enabled")
+            return False
+
+        tool_id = monitoring.PROFILER_ID
+        events = monitoring.events
+        monitoring.use_tool_id(tool_id, _TOOL_NAME)
+        for event, callback in self._callbacks(events).items():
+            monitoring.register_callback(tool_id, event, callback)
+        monitoring.set_events(
+            tool_id,
+            events.PY_YIELD | events.PY_RESUME | events.PY_THROW | events.PY_RETURN | events.PY_UNWIND
+        )
+
+        self.enabled = True
+        logger.info("Async profiling enabled")
+        return True
+
+    def stop(self):
+        """Unregister the callbacks and release the tool id"""
+        if not self.enabled:
+            return
+
+        monitoring = sys.monitoring
+        tool_id = monitoring.PROFILER_ID
+        monitoring.set_events(tool_id, 0)
+        for event in self._callbacks(monitoring.events):
+            monitoring.register_callback(tool_id, event, None)
+        monitoring.free_tool_id(tool_id)
+        self._suspended_at.clear()
+        self.enabled = False
+
+    def _callbacks(self, events):
+        return {
+            events.PY_YIELD: self._on_yield,
+            events.PY_RESUME: self._on_resume,
+            events.PY_THROW: self._on_throw,
+            events.PY_RETURN: self._on_return,
+            events.PY_UNWIND: self._on_unwind,
+        }
+
+    def _on_yield(self, code, instruction_offset, retval):
+        if not code.co_flags & inspect.CO_COROUTINE:
+            # Generators etc.: stop reporting this location entirely
+            return sys.monitoring.DISABLE
+        suspended = self._suspended_at
+        if len(suspended) >= MAX_SUSPENDED:
+            suspended.pop(next(iter(suspended)))
+        suspended[id(sys._getframe(1))] = time.perf_counter()
+
+    def _on_throw(self, code, instruction_offset, exception):
+        return self._on_resume(code, instruction_offset)
+
+    def _on_return(self, code, instruction_offset, retval):
+        if not code.co_flags & inspect.CO_COROUTINE:
+            return sys.monitoring.DISABLE
+        self._suspended_at.pop(id(sys._getframe(1)), None)
+
+    def _on_unwind(self, code, instruction_offset, exception):
+        # PY_UNWIND can't be disabled per location, so keep this cheap
+        if code.co_flags & inspect.CO_COROUTINE:
+            self._suspended_at.pop(id(sys._getframe(1)), None)
+
+    def _on_resume(self, code, instruction_offset):
+        if not code.co_flags & inspect.CO_COROUTINE:
+            return sys.monitoring.DISABLE
+        started = self._suspended_at.pop(id(sys._getframe(1)), None)
+        if started is None:
+            return
+        entry = self._stats[code.co_qualname]
+        entry[0] += 1
+        entry[1] += time.perf_counter() - started
+
+    def snapshot(self, limit: int = 50) -> Dict[str, Any]:
+        """
+        Coroutines with the most time spent awaiting
+
+        Returns:
+            {qualname: {"suspensions": n, "total_ms": ..., "avg_ms": ...}}
+        """
+        ranked = sorted(self._stats.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            name: {
+                "suspensions": count,
+                "total_ms": round(seconds * 1000, 3),
+                "avg_ms": round(seconds * 1000 / count, 3) if count else 0.0
+            }
+            for name, (count, seconds) in ranked[:limit]
+        }
+
+
+# Global profiler instance
+_profiler = None
+
+def get_async_profiler() -> AsyncProfiler:
+    """Get or create the global async profiler"""
+    global _profiler
+    if _profiler is None:
+        _profiler = AsyncProfiler()
+    return _profiler
@@ -0,0 +1,34 @@
+"""
+Clock Utilities
+Cheap, second-resolution timestamps for response payloads
+"""
+
+import time
+from datetime import datetime, timezone
+
+
+# (unix second, ISO string) - replaced as a single tuple so readers never see a torn pair
+_iso_cache = (-1, "")
+
+
+def now_iso() -> str:
+    """
+    Current UTC time as an ISO-8601 string, at one-second resolution
+
+    The string is formatted at most once per second and reused in between,
+    which is plenty for health checks and response timestamps.
+
+    Usage:
+        from shared.utils.clock import now_iso
+        return {"status": "healthy", "timestamp": now_iso()}
+    """
+    global _iso_cache
+
+    second = int(time.time())
+    cached_second, cached_iso = _iso_cache
+    if second == cached_second:
+        return cached_iso
+
+    iso = datetime.fromtimestamp(second, tz=timezone.utc).isoformat()
+    _iso_cache = (second, iso)
+    return iso
@@ -0,0 +1,55 @@
+"""
+Test Async Profiler
+Suspended-coroutine bookkeeping is released when coroutines finish
+"""
+
+import asyncio
+import sys
+
+import pytest
+
+from shared.utils.async_profiler import AsyncProfiler
+
+pytestmark = pytest.mark.skipif(not hasattr(sys, "monitoring"), reason="needs Python 3.12+")
+
+
+@pytest.fixture
+def profiler():
+    profiler = AsyncProfiler()
+    assert profiler.start()
+    yield profiler
+    profiler.stop()
+
+
+async def sleeper():
+    await asyncio.sleep(0.001)
+
+
+async def forever():
+    await asyncio.sleep(100)
+
+
+def test_records_await_time(profiler):
+    async def main():
+        await asyncio.gather(*(sleeper() for _ in range(10)))
+
+    asyncio.run(main())
+
+    assert profiler.snapshot()["sleeper"]["suspensions"] == 10
+    assert not profiler._suspended_at
+
+
+def test_cancelled_and_closed_coroutines_do_not_leak(profiler):
+    async def main():
+        tasks = [asyncio.create_task(forever()) for _ in range(20)]
+        await asyncio.sleep(0.001)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        coroutine = forever()
+        coroutine.close()
+
+    asyncio.run(main())
+
+    assert not profiler._suspended_at
@@ -0,0 +1,116 @@
+"""
+Test API authentication helpers
+JWT verification in decode_token and password rehashing on login
+"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+api = pytest.importorskip("production_api")
+
+import bcrypt
+import jwt
+from fastapi import HTTPException
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    api.token_cache.clear()
+    yield
+    api.token_cache.clear()
+
+
+def encode(payload):
+    return jwt.encode(payload, api.config.JWT_SECRET, algorithm="HS256")
+
+
+def assert_rejected(token):
+    with pytest.raises(HTTPException) as excinfo:
+        api.decode_token(token)
+    assert excinfo.value.status_code == 401
+
+
+def test_decode_token_accepts_valid_token():
+    token = api.create_token("user-1")
+    assert api.decode_token(token)["sub"] == "user-1"
+    # Second call is served from the cache
+    assert api.decode_token(token)["sub"] == "user-1"
+
+
+def test_decode_token_rejects_missing_exp():
+    assert_rejected(encode({"sub": "user-1"}))
+
+
+def test_decode_token_rejects_missing_sub():
+    assert_rejected(encode({"exp": int(time.time()) + 3600}))
+
+
+def test_decode_token_rejects_expired_token():
+    assert_rejected(encode({"sub": "user-1", "exp": int(time.time()) - 10}))
+
+
+def test_decode_token_rejects_bad_signature():
+    token = jwt.encode({"sub": "user-1", "exp": int(time.time()) + 3600}, "other-secret", algorithm="HS256")
+    assert_rejected(token)
+
+
+class FakeSession:
+    """Returns one login row and records the statements run against it"""
+
+    def __init__(self, row):
+        self.row = row
+        self.executed = []
+        self.commits = 0
+
+    def execute(self, statement, params):
+        self.executed.append((statement, params))
+        return SimpleNamespace(first=lambda: self.row)
+
+    def commit(self):
+        self.commits += 1
+
+
+def login_row(password, rounds):
+    password_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=rounds)).decode()
+    return SimpleNamespace(id="user-1", company_id="company-1", company_name="Acme",
+                           password_hash=password_hash)
+
+
+def test_needs_rehash(monkeypatch):
+    monkeypatch.setattr(api.config, "BCRYPT_ROUNDS", 5)
+    assert not api.needs_rehash(login_row("secret", 5).password_hash)
+    assert api.needs_rehash(login_row("secret", 4).password_hash)
+
+
+def test_authenticate_rehashes_when_rounds_change(monkeypatch):
+    monkeypatch.setattr(api.config, "BCRYPT_ROUNDS", 5)
+    db = FakeSession(login_row("secret", 4))
+
+    assert api.authenticate(db, "a@example.com", "secret") is db.row
+
+    statement, params = db.executed[-1]
+    assert statement is api.UPDATE_PASSWORD_HASH
+    assert params["id"] == "user-1"
+    assert params["password_hash"].startswith("$2b$05$")
+    assert bcrypt.checkpw(b"secret", params["password_hash"].encode())
+    assert db.commits == 1
+
+
+def test_authenticate_keeps_current_hash(monkeypatch):
+    monkeypatch.setattr(api.config, "BCRYPT_ROUNDS", 4)
+    db = FakeSession(login_row("secret", 4))
+
+    assert api.authenticate(db, "a@example.com", "secret") is db.row
+    assert [s for s, _ in db.executed] == [api.LOGIN_BY_EMAIL]
+    assert db.commits == 0
+
+
+def test_authenticate_rejects_wrong_password(monkeypatch):
+    monkeypatch.setattr(api.config, "BCRYPT_ROUNDS", 5)
+    db = FakeSession(login_row("secret", 4))
+
+    assert api.authenticate(db, "a@example.com", "wrong") is None
+    assert db.commits == 0
+    assert api.authenticate(FakeSession(None), "a@example.com", "secret") is None
@@ -0,0 +1,77 @@
+"""
+Test Configuration Manager
+Shared default configs are read-only; workflows are built on top without changing them
+"""
+
+import pytest
+
+pytest.importorskip("cachetools")
+
+from shared.config.config_manager import ConfigurationManager, WorkflowBuilder
+
+
+def test_returned_config_cannot_change_defaults():
+    manager = ConfigurationManager(config_source="default")
+    config = manager.get_report_config("ap_aging")
+
+    with pytest.raises(TypeError):
+        config["report_type"] = "changed"
+    with pytest.raises(TypeError):
+        config["settings"]["include_paid"] = True
+    with pytest.raises(TypeError):
+        config["nodes"]["fetch_invoices"]["params"]["category"] = "sales"
+    with pytest.raises(AttributeError):
+        config["settings"]["aging_buckets"].append(120)
+
+    fresh = ConfigurationManager(config_source="default").get_report_config("ap_aging")
+    assert fresh["settings"]["aging_buckets"] == (30, 60, 90)
+    assert fresh["settings"]["include_paid"] is False
+    assert fresh["nodes"]["fetch_invoices"]["params"]["category"] == "purchase"
+
+
+def test_node_config_cannot_change_defaults():
+    manager = ConfigurationManager()
+    node_config = manager.get_node_config("SLACheckerNode")
+
+    with pytest.raises(TypeError):
+        node_config["sla_days"] = 5
+
+    assert manager.get_node_config("SLACheckerNode")["sla_days"] == 30
+    assert manager.get_node_config("UnknownNode") == {}
+
+
+def test_build_workflow_applies_filters_and_output_format():
+    builder = WorkflowBuilder(ConfigurationManager(config_source="default"))
+    workflow = builder.build_workflow({
+        "report_type": "ap_aging",
+        "filters": {"vendor_name": "AWS", "grand_total": ">100", "date_from": "2025-01-01"},
+        "output_format": "pdf"
+    })
+
+    assert type(workflow) is dict
+    conditions = workflow["nodes"]["filter_by_status"]["params"]["conditions"]
+    assert [c["field"] for c in conditions] == ["status", "vendor_name", "grand_total"]
+    assert conditions[1]["operator"] == "contains"
+    assert conditions[2]["operator"] == ">"
+    assert workflow["nodes"]["generate_output"]["node_type"] == "PDFGeneratorNode"
+    assert workflow["pipeline"][0] == "fetch_invoices"
+
+
+def test_build_workflow_does_not_mutate_base_config():
+    manager = ConfigurationManager(config_source="default")
+    builder = WorkflowBuilder(manager)
+    builder.build_workflow({
+        "report_type": "ap_aging",
+        "filters": {"vendor_name": "AWS"},
+        "output_format": "json"
+    })
+
+    base = manager.get_report_config("ap_aging")
+    assert len(base["nodes"]["filter_by_status"]["params"]["conditions"]) == 1
+    assert base["nodes"]["generate_output"]["node_type"] == "ExcelGeneratorNode"
+
+    # A second build starts from the untouched base
+    workflow = builder.build_workflow({"report_type": "ap_aging", "filters": {}})
+    assert len(workflow["nodes"]["filter_by_status"]["params"]["conditions"]) == 1
+    assert workflow["nodes"]["generate_output"]["node_type"] == "ExcelGeneratorNode"
+    assert builder.build_workflow({"report_type": "unknown"}) is None
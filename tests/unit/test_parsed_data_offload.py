@@ -0,0 +1,82 @@
+"""
+Test parsed-data offload in DatabaseManager
+Large Docling output goes to a side file; the column holds a reference
+"""
+
+import json
+from contextlib import contextmanager
+
+import pytest
+
+pytest.importorskip("psycopg2")
+pytest.importorskip("zstandard")
+
+from data_layer.database import database_manager
+from data_layer.database.database_manager import DatabaseManager
+
+
+LARGE = {"text": "x" * (database_manager.PARSED_DATA_INLINE_LIMIT + 1), "tables": []}
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """DatabaseManager with no pool; rows are captured instead of inserted"""
+    monkeypatch.setattr(database_manager, "PARSED_DATA_DIR", tmp_path)
+    manager = DatabaseManager.__new__(DatabaseManager)
+    manager.rows = []
+    manager._insert_row = manager.rows.append
+    return manager
+
+
+def test_reference_is_relative_and_resolves(db, tmp_path):
+    doc_id = db.insert_document({"id": "doc-1", "parsed_data": LARGE})
+
+    column = json.loads(db.rows[0][14])
+    assert column["$ref"] == "doc-1.json.zst"
+    assert column["summary"]["size_bytes"] > database_manager.PARSED_DATA_INLINE_LIMIT
+    assert (tmp_path / "doc-1.json.zst").exists()
+    assert DatabaseManager.load_parsed_data(column) == LARGE
+    assert doc_id == "doc-1"
+
+
+def test_inline_values_pass_through(db):
+    db.insert_document({"id": "doc-3", "parsed_data": {"text": "short"}})
+
+    column = json.loads(db.rows[0][14])
+    assert column == {"text": "short"}
+    assert DatabaseManager.load_parsed_data(column) == column
+
+
+def test_failed_insert_removes_side_file(db, tmp_path):
+    def fail(values):
+        raise RuntimeError("insert failed")
+    db._insert_row = fail
+
+    with pytest.raises(RuntimeError):
+        db.insert_document({"id": "doc-4", "parsed_data": LARGE})
+
+    assert not (tmp_path / "doc-4.json.zst").exists()
+
+
+def test_missing_side_file_returns_reference(db, tmp_path):
+    db.insert_document({"id": "doc-5", "parsed_data": LARGE})
+    column = json.loads(db.rows[0][14])
+    (tmp_path / "doc-5.json.zst").unlink()
+
+    class Cursor:
+        def execute(self, query, params):
+            pass
+        def fetchone(self):
+            return {"id": "doc-5", "docling_parsed_data": column, "canonical_data": {}}
+
+    class Connection:
+        def cursor(self, cursor_factory=None):
+            return Cursor()
+
+    @contextmanager
+    def connection():
+        yield Connection()
+    db.connection = connection
+
+    doc = db.get_document_by_id("doc-5")
+    assert doc["docling_parsed_data"] == column
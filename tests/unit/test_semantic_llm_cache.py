@@ -0,0 +1,65 @@
+"""
+Test Semantic LLM Cache
+Near-miss queries must not reuse each other's results
+"""
+
+import pytest
+
+from shared.cache.semantic_llm_cache import SemanticLLMCache, normalize_query, query_signature
+
+
+NEAR_MISSES = [
+    ("show AWS invoices this month", "show AWS invoices last month"),
+    ("show AWS invoices this month", "show Google invoices this month"),
+    ("overdue bills last 30 days", "overdue bills last 90 days"),
+    ("AP aging for Q1", "AP aging for Q2"),
+    ("total spend this quarter", "total spend this year"),
+]
+
+PARAPHRASES = [
+    ("show me AWS invoices this month", "list all AWS invoices this month"),
+    ("What are my overdue bills last 30 days", "overdue bills last 30 days please"),
+]
+
+
+def sig(query):
+    return query_signature(normalize_query(query))
+
+
+def test_signature_rejects_near_misses():
+    """Different periods, vendors or numbers give different signatures"""
+    for a, b in NEAR_MISSES:
+        assert sig(a) != sig(b), (a, b)
+
+
+def test_signature_accepts_paraphrases():
+    """Only filler words differ"""
+    for a, b in PARAPHRASES:
+        assert sig(a) == sig(b), (a, b)
+
+
+def make_cache():
+    """Cache whose 'model' embeds every query to the same vector (cosine 1.0)"""
+    np = pytest.importorskip("numpy")
+    cache = SemanticLLMCache()
+    cache._np = np
+    vector = np.ones(4, dtype=np.float32) / 2
+    cache._embed = lambda text: vector.astype(np.float16)
+    return cache
+
+
+def test_get_rejects_near_misses_despite_similarity():
+    cache = make_cache()
+    for a, b in NEAR_MISSES:
+        cache.clear()
+        cache.set(a, "company-1", {"query": a})
+        assert cache.get(b, "company-1") is None, (a, b)
+
+
+def test_get_returns_paraphrase_hit():
+    cache = make_cache()
+    a, b = PARAPHRASES[0]
+    cache.set(a, "company-1", {"query": a})
+    assert cache.get(b, "company-1") == {"query": a}
+    # Scoped per company
+    assert cache.get(b, "company-2") is None